@@ -0,0 +1,56 @@
+"""
+Latency and throughput of LLMLingua-2 compression with and without
+micro-batching. Needs llmlingua and its model weights.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_ai_compress
+"""
+
+import asyncio
+import statistics
+import time
+
+from benchmarks.corpus import make_corpus
+from services.ai_compressor import AICompressor
+
+CONCURRENCY = [1, 4, 8, 16]
+BATCH_SIZES = [1, 8]
+
+
+async def run(compressor: AICompressor, prompts, concurrency: int):
+    latencies = []
+
+    async def one(prompt: str):
+        start = time.perf_counter()
+        await compressor.compress(prompt, rate=0.33)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(0, len(prompts), concurrency):
+        await asyncio.gather(*(one(p) for p in prompts[i : i + concurrency]))
+    return time.perf_counter() - start, latencies
+
+
+async def main():
+    corpus = make_corpus(per_kind=8)
+    prompts = corpus["long_rag"][:4] + corpus["short_chat"] + corpus["code"][:4]
+
+    compressor = AICompressor()
+    compressor.compress_batch(["warm up the model"])
+
+    print(f"{len(prompts)} prompts")
+    print(f"{'batch':>6} {'conc':>5} {'seconds':>8} {'p50 (s)':>8} {'max (s)':>8}")
+    for batch_size in BATCH_SIZES:
+        compressor.max_batch_size = batch_size
+        for concurrency in CONCURRENCY:
+            seconds, latencies = await run(compressor, prompts, concurrency)
+            print(
+                f"{batch_size:>6} {concurrency:>5} {seconds:>8.2f} "
+                f"{statistics.median(latencies):>8.3f} {max(latencies):>8.3f}"
+            )
+    compressor.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+"""
+Benchmark chunk removal in TextProcessor.trim on texts with many repeated
+boilerplate sections, against the old one-occurrence-at-a-time string
+rebuilding. tests/test_prompt_trimmer.py checks that both agree.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_chunk_removal
+"""
+
+import random
+import time
+
+from services.prompt_trimmer import TextProcessor
+
+BOILERPLATE = (
+    "This message and any attachments are confidential and intended solely "
+    "for the addressee. If you received it in error, please delete it. "
+)
+
+WORDS = "alpha beta gamma delta epsilon zeta theta kappa lambda sigma omega".split()
+
+
+def make_text(sections: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = []
+    for i in range(sections):
+        body = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 30)))
+        parts.append(f"Ticket {i}: {body}. {BOILERPLATE}")
+    return "".join(parts)
+
+
+def chunk_spans(processor: TextProcessor, text: str, min_length: int = 15):
+    chunks = processor.find_repeated_chunks(text, min_length=min_length)
+    non_overlapping_chunks = processor.find_non_overlapping_chunks(chunks)
+    order = []
+    for chunk, positions, _ in sorted(
+        non_overlapping_chunks, key=lambda x: (-x[1][0], -len(x[0]))
+    ):
+        for pos in sorted(positions[1:], reverse=True):
+            order.append((pos, pos + len(chunk)))
+    return order
+
+
+def legacy_remove(text: str, ordered_spans) -> str:
+    for start, end in ordered_spans:
+        text = text[:start] + " " + text[end:]
+    return text
+
+
+def main():
+    processor = TextProcessor()
+
+    print(f"{'sections':>10} {'chars':>10} {'spans':>8} {'legacy (s)':>12} {'new (s)':>10}")
+    for sections in (100, 1_000, 5_000):
+        text = make_text(sections)
+        ordered_spans = chunk_spans(processor, text)
+
+        start = time.perf_counter()
+        legacy_remove(text, ordered_spans)
+        legacy_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        processor._remove_spans(text, ordered_spans)
+        new_seconds = time.perf_counter() - start
+
+        print(
+            f"{sections:>10} {len(text):>10} {len(ordered_spans):>8} "
+            f"{legacy_seconds:>12.4f} {new_seconds:>10.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
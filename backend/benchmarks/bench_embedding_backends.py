@@ -0,0 +1,127 @@
+"""
+Latency and memory of the ModelOutputComparison embedding backends.
+
+Each backend is loaded in its own process so peak RSS is not shared, and
+the largest drift of its (prompt, trimmed prompt) similarity scores from
+torch is reported; tests/test_model_output_comparison.py holds the
+tolerances. The ONNX backends need `pip install "sentence-transformers[onnx]"`.
+Run from the backend directory:
+
+    python -m benchmarks.bench_embedding_backends
+"""
+
+import argparse
+import multiprocessing
+import resource
+import statistics
+import time
+
+from benchmarks.corpus import make_corpus
+
+BACKENDS = ["torch", "onnx", "onnx-int8"]
+REPEAT = 5
+
+
+def make_pairs(per_kind: int, seed: int):
+    from services.prompt_trimmer import TextProcessor
+
+    processor = TextProcessor()
+    prompts = [p for ps in make_corpus(per_kind, seed).values() for p in ps]
+    return [
+        (prompt, processor.trim(prompt, engine="fast", remove_spaces=False))
+        for prompt in prompts
+    ]
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(backend: str, max_seq_length, pairs, results):
+    from services.model_output_comparison import ModelOutputComparison
+
+    start = time.perf_counter()
+    comparison = ModelOutputComparison(
+        backend=backend, max_seq_length=max_seq_length
+    )
+    load_seconds = time.perf_counter() - start
+    load_rss = peak_rss_mb()
+
+    originals = [a for a, _ in pairs]
+    trimmed = [b for _, b in pairs]
+    comparison.calculate_similarity_batch(originals[:2], trimmed[:2])
+
+    single, batch = [], []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        comparison.calculate_similarity(*pairs[0])
+        single.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        scores = comparison.calculate_similarity_batch(originals, trimmed)
+        batch.append(time.perf_counter() - start)
+
+    results.put(
+        {
+            "backend": backend,
+            "scores": scores.tolist(),
+            "loadSeconds": load_seconds,
+            "singleMs": statistics.median(single) * 1000,
+            "batchMs": statistics.median(batch) * 1000,
+            "loadRssMb": load_rss,
+            "peakRssMb": peak_rss_mb(),
+        }
+    )
+
+
+def run(backend: str, max_seq_length, pairs):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(
+        target=measure, args=(backend, max_seq_length, pairs, results)
+    )
+    process.start()
+    process.join()
+    if process.exitcode != 0:
+        return None
+    return results.get()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", default=BACKENDS)
+    parser.add_argument("--max-seq-length", type=int)
+    parser.add_argument("--per-kind", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    pairs = make_pairs(args.per_kind, args.seed)
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]
+    print(f"{len(pairs)} pairs, max_seq_length={args.max_seq_length}")
+    print(
+        f"{'backend':>10} {'load (s)':>9} {'single (ms)':>12} {'batch (ms)':>11} "
+        f"{'load MB':>8} {'peak MB':>8} {'max diff':>9}"
+    )
+
+    reference = None
+    for backend in backends:
+        result = run(backend, args.max_seq_length, pairs)
+        if result is None:
+            print(f"{backend:>10} failed to load, see the traceback above")
+            continue
+        if backend == "torch":
+            reference = result["scores"]
+        diff = (
+            max(abs(a - b) for a, b in zip(result["scores"], reference))
+            if reference is not None
+            else float("nan")
+        )
+        print(
+            f"{backend:>10} {result['loadSeconds']:>9.2f} "
+            f"{result['singleMs']:>12.1f} {result['batchMs']:>11.1f} "
+            f"{result['loadRssMb']:>8.0f} {result['peakRssMb']:>8.0f} "
+            f"{diff:>9.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Compare the "fast" trimming engine with the NLTK engine.
+
+Times both engines on a ~100 KB input built from sample prompts;
+tests/test_prompt_trimmer.py checks that their output is identical. Run
+from the backend directory:
+
+    python -m benchmarks.bench_fast_trim
+"""
+
+import random
+import time
+
+from services.prompt_trimmer import TextProcessor
+
+SAMPLE_PROMPTS = [
+    "What is the capital of France?",
+    "Summarize the following article in three bullet points, focusing on the "
+    "main arguments and leaving out any examples.",
+    'Translate "Good morning, how are you?" into German and Spanish.',
+    "You are a helpful assistant. Answer the question based only on the "
+    "context below. If the answer is not in the context, say you do not know.",
+    "Write a Python function that returns the n-th Fibonacci number; it "
+    "should run in O(n) time and use O(1) memory.",
+    "Compare the state-of-the-art approaches for retrieval-augmented "
+    "generation (RAG) published between 2020 and 2024.",
+    "The invoice total was $1,250.75 and it is due on 12:30 Monday -- please "
+    "remind me!",
+    "List 5 reasons why unit tests matter... then explain each one briefly.",
+    "Do NOT include any personal opinions. Keep the tone neutral and formal.",
+    "Explain the difference between TCP and UDP to a ten-year-old.",
+]
+
+OPTIONS = [
+    {},
+    {"remove_spaces": False},
+    {"remove_punctuation": False, "remove_spaces": False},
+    {"remove_stopwords": False},
+    {"stemmer": "porter", "remove_spaces": False},
+]
+
+
+def make_input(size: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size:
+        prompt = rng.choice(SAMPLE_PROMPTS)
+        parts.append(prompt)
+        length += len(prompt) + 1
+    return " ".join(parts)
+
+
+def best_of(func, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    processor = TextProcessor()
+
+    text = make_input(100_000)
+    for options in OPTIONS:
+        # chunk removal is shared by both engines, so leave it out here
+        nltk_seconds = best_of(
+            lambda: processor.trim(text, engine="nltk", remove_chunks=False, **options)
+        )
+        fast_seconds = best_of(
+            lambda: processor.trim(text, engine="fast", remove_chunks=False, **options)
+        )
+        print(
+            f"{str(options):<55} nltk {nltk_seconds:.3f}s  fast {fast_seconds:.3f}s  "
+            f"speedup {nltk_seconds / fast_seconds:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
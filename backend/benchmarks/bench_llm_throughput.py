@@ -0,0 +1,66 @@
+"""
+Completion throughput of LLMInteractionService without the network.
+
+Fires concurrent uncached requests at the echo provider and at the OpenAI
+provider pointed at the local stub server, for a few connection pool
+sizes. Run from the backend directory:
+
+    python -m benchmarks.bench_llm_throughput
+"""
+
+import asyncio
+import time
+
+import httpx
+
+from benchmarks.stub_openai import StubOpenAIServer
+from services.llm_providers import EchoProvider, OpenAIProvider
+from services.llm_service import LLMInteractionService
+
+REQUESTS = 200
+CONCURRENCY = 50
+LATENCY = 0.02
+POOL_SIZES = [1, 10, 50]
+
+
+async def run(service: LLMInteractionService) -> float:
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def one(i: int):
+        async with semaphore:
+            await service.get_answer(f"prompt number {i}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(REQUESTS)))
+    return time.perf_counter() - start
+
+
+async def main():
+    print(f"{REQUESTS} requests, {CONCURRENCY} in flight, {LATENCY}s per answer")
+    print(f"{'provider':>10} {'pool':>6} {'seconds':>8} {'req/s':>8}")
+
+    service = LLMInteractionService(provider=EchoProvider(latency=LATENCY))
+    seconds = await run(service)
+    print(f"{'echo':>10} {'-':>6} {seconds:>8.2f} {REQUESTS / seconds:>8.1f}")
+
+    with StubOpenAIServer(latency=LATENCY) as server:
+        for pool_size in POOL_SIZES:
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=pool_size, max_keepalive_connections=pool_size
+                ),
+                timeout=60.0,
+            )
+            provider = OpenAIProvider(
+                api_key="stub", base_url=server.base_url, http_client=http_client
+            )
+            seconds = await run(LLMInteractionService(provider=provider))
+            await http_client.aclose()
+            print(
+                f"{'openai':>10} {pool_size:>6} {seconds:>8.2f} "
+                f"{REQUESTS / seconds:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""
+Measure time and peak memory of find_non_overlapping_chunks on repetitive
+log dumps, comparing the IntervalSet filter with the old per-character set.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_overlap_filter
+"""
+
+import random
+import time
+import tracemalloc
+
+from services.prompt_trimmer import TextProcessor
+
+LEVELS = ["INFO", "WARN", "ERROR", "DEBUG"]
+MESSAGES = [
+    "connection pool exhausted, retrying request to upstream service",
+    "user session refreshed successfully for tenant default",
+    "cache miss for key prompt:embedding, recomputing vector",
+    "request completed with status 200 in 12ms",
+]
+
+
+def make_log(lines: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return "\n".join(
+        f"2024-01-01T00:00:{i % 60:02d} {rng.choice(LEVELS)} {rng.choice(MESSAGES)}"
+        for i in range(lines)
+    )
+
+
+def legacy_filter(chunks):
+    filtered_chunks = []
+    used_positions = set()
+    for chunk, positions, occurrences in chunks:
+        chunk_positions = set(range(pos, pos + len(chunk)) for pos in positions)
+        if not any(
+            pos in used_positions
+            for positions_set in chunk_positions
+            for pos in positions_set
+        ):
+            filtered_chunks.append((chunk, positions, occurrences))
+            used_positions.update(
+                pos for positions_set in chunk_positions for pos in positions_set
+            )
+    return filtered_chunks
+
+
+def measure(func, chunks):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(chunks)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def main():
+    processor = TextProcessor()
+    print(
+        f"{'lines':>8} {'chunks':>8} {'legacy (s)':>11} {'legacy peak':>12} "
+        f"{'new (s)':>9} {'new peak':>10}"
+    )
+    for lines in (1_000, 5_000, 20_000):
+        text = make_log(lines)
+        chunks = processor.find_repeated_chunks(text, min_length=15)
+
+        legacy, legacy_seconds, legacy_peak = measure(legacy_filter, chunks)
+        new, new_seconds, new_peak = measure(
+            processor.find_non_overlapping_chunks, chunks
+        )
+        assert new == legacy
+
+        print(
+            f"{lines:>8} {len(chunks):>8} {legacy_seconds:>11.3f} "
+            f"{legacy_peak / 2**20:>10.1f}MB {new_seconds:>9.3f} "
+            f"{new_peak / 2**20:>8.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
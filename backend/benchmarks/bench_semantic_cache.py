@@ -0,0 +1,57 @@
+"""
+Lookup latency of SemanticCache as it fills up.
+
+Uses random unit vectors with MiniLM's 384 dimensions, so no model is
+loaded. Run from the backend directory:
+
+    python -m benchmarks.bench_semantic_cache
+"""
+
+import time
+
+import numpy as np
+
+from services.semantic_cache import SemanticCache
+
+DIM = 384
+SIZES = [100, 1_000, 10_000, 50_000]
+LOOKUPS = 200
+
+
+def unit_vectors(count: int, rng: np.random.Generator) -> np.ndarray:
+    vectors = rng.standard_normal((count, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    scope = SemanticCache.scope("original", "gpt-4o-mini", 0.3)
+    print(f"{'entries':>8} {'fill (s)':>9} {'lookup (us)':>12} {'hit rate':>9}")
+    for size in SIZES:
+        cache = SemanticCache(encode=None, capacity=size)
+        stored = unit_vectors(size, rng)
+
+        start = time.perf_counter()
+        for i, vector in enumerate(stored):
+            cache.add(vector, f"answer {i}", scope)
+        fill_seconds = time.perf_counter() - start
+
+        # half near-duplicates of stored prompts, half unrelated
+        picks = stored[rng.integers(0, size, LOOKUPS // 2)]
+        near = picks + 0.01 * unit_vectors(len(picks), rng)
+        near /= np.linalg.norm(near, axis=1, keepdims=True)
+        queries = np.concatenate([near, unit_vectors(LOOKUPS // 2, rng)])
+
+        start = time.perf_counter()
+        for query in queries:
+            cache.lookup(query, scope)
+        lookup_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+        print(
+            f"{size:>8} {fill_seconds:>9.2f} {lookup_us:>12.1f} "
+            f"{cache.stats()['hitRate']:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
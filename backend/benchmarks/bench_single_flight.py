@@ -0,0 +1,66 @@
+"""
+Throughput of LLMInteractionService under bursts of concurrent requests,
+many of them identical, against an echo provider with no response cache.
+Single-flight coalescing means each unique (model, prompt) pair reaches
+the provider once per burst; tests/test_llm_service.py checks that.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_single_flight
+"""
+
+import asyncio
+import random
+import time
+
+from services.llm_providers import EchoProvider
+from services.llm_service import LLMInteractionService
+
+LATENCY = 0.05
+BURST = 500
+UNIQUE_PROMPTS = [1, 20, 500]
+
+
+class CountingProvider(EchoProvider):
+    def __init__(self, latency: float):
+        super().__init__(latency=latency)
+        self.calls = 0
+
+    async def complete(self, prompt, model, temperature, system=None):
+        self.calls += 1
+        return await super().complete(prompt, model, temperature)
+
+
+async def burst(unique_prompts: int):
+    provider = CountingProvider(LATENCY)
+    service = LLMInteractionService(provider=provider)
+    rng = random.Random(0)
+    requests = [
+        (
+            f"popular prompt {rng.randrange(unique_prompts)}",
+            rng.choice(["original", "trimmed"]),
+            rng.choice([None, "small-model"]),
+        )
+        for _ in range(BURST)
+    ]
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            service.get_answer(prompt, namespace=namespace, model=model)
+            for prompt, namespace, model in requests
+        )
+    )
+    return time.perf_counter() - start, provider.calls, service.coalesced
+
+
+async def main():
+    print(f"{BURST} concurrent requests, {LATENCY * 1000:.0f} ms provider latency")
+    print(f"{'prompts':>8} {'calls':>6} {'coalesced':>10} {'seconds':>8}")
+    for unique_prompts in UNIQUE_PROMPTS:
+        seconds, calls, coalesced = await burst(unique_prompts)
+        print(f"{unique_prompts:>8} {calls:>6} {coalesced:>10} {seconds:>8.3f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+"""
+Report cold import time per backend module.
+
+Every module is imported in a fresh interpreter so earlier imports do not
+hide its cost. Run from the backend directory:
+
+    python -m benchmarks.bench_startup
+"""
+
+import subprocess
+import sys
+
+MODULES = [
+    "services.energy_calculator",
+    "services.token_tracker",
+    "services.prompt_trimmer",
+    "services.llm_service",
+    "services.model_output_comparison",
+    "services.registry",
+    "main",
+]
+
+SNIPPET = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+
+def import_seconds(module: str, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", SNIPPET.format(module=module)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return min(timings)
+
+
+def main():
+    print(f"{'module':<36} {'import (s)':>10}")
+    for module in MODULES:
+        try:
+            print(f"{module:<36} {import_seconds(module):>10.3f}")
+        except subprocess.CalledProcessError as e:
+            print(f"{module:<36} {'failed':>10}  {e.stderr.strip().splitlines()[-1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark SuffixArray construction from 1 KB to 1 MB inputs.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_suffix_array
+"""
+
+import random
+import time
+
+from services.prompt_trimmer import SuffixArray
+
+SIZES = [1_000, 10_000, 50_000, 100_000, 500_000, 1_000_000]
+
+WORDS = (
+    "the quick brown fox jumps over lazy dog context retrieval answer "
+    "document section summary please explain following question"
+).split()
+
+
+def make_text(size: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        parts.append(word)
+        length += len(word) + 1
+    return " ".join(parts)[:size]
+
+
+def bench(size: int):
+    text = make_text(size)
+    sa_builder = SuffixArray(text)
+
+    start = time.perf_counter()
+    suffix_array = sa_builder.build_suffix_array()
+    sa_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sa_builder.build_lcp_array(suffix_array)
+    lcp_seconds = time.perf_counter() - start
+
+    return sa_seconds, lcp_seconds
+
+
+def main():
+    print(f"{'size':>10} {'suffix array (s)':>18} {'lcp (s)':>10} {'us/char':>10}")
+    for size in SIZES:
+        sa_seconds, lcp_seconds = bench(size)
+        per_char = (sa_seconds + lcp_seconds) / size * 1e6
+        print(f"{size:>10} {sa_seconds:>18.4f} {lcp_seconds:>10.4f} {per_char:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Throughput of TextProcessor.trim_many from 1 worker up to all cores.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_trim_many
+"""
+
+import os
+import random
+import time
+
+from services.prompt_trimmer import TextProcessor
+
+PARAGRAPHS = [
+    "You are a helpful assistant. Answer the question based only on the "
+    "context below. If the answer is not in the context, say you do not know. ",
+    "The quarterly report shows revenue growth in all regions, with the "
+    "strongest increase in the European market driven by new enterprise deals. ",
+    "Please summarize the following customer feedback and list the three most "
+    "frequently mentioned issues, ordered by how often they occur. ",
+    "Our return policy allows customers to return unused items within thirty "
+    "days of purchase for a full refund, excluding shipping costs. ",
+]
+
+
+def make_prompts(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [
+        "".join(rng.choice(PARAGRAPHS) for _ in range(rng.randint(5, 40)))
+        for _ in range(count)
+    ]
+
+
+def main():
+    processor = TextProcessor()
+    prompts = make_prompts(400)
+    chars = sum(len(prompt) for prompt in prompts)
+
+    baseline = None
+    expected = None
+    workers = 1
+    print(f"{len(prompts)} prompts, {chars / 1e6:.1f} MB")
+    print(f"{'workers':>8} {'seconds':>8} {'prompts/s':>10} {'speedup':>8}")
+    while workers <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        results = processor.trim_many(prompts, workers=workers)
+        seconds = time.perf_counter() - start
+
+        if expected is None:
+            expected, baseline = results, seconds
+        assert results == expected
+
+        print(
+            f"{workers:>8} {seconds:>8.2f} {len(prompts) / seconds:>10.1f} "
+            f"{baseline / seconds:>7.1f}x"
+        )
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
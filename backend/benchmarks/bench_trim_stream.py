@@ -0,0 +1,79 @@
+"""
+Peak memory and time to first output of trim_stream versus trim on a
+multi-megabyte document built from the synthetic corpus.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_trim_stream
+"""
+
+import time
+import tracemalloc
+
+from benchmarks.corpus import make_corpus
+from services.prompt_trimmer import TextProcessor
+
+TARGET_CHARS = 2_000_000
+PIECE_CHARS = 8_192
+OPTIONS = {"engine": "fast", "remove_spaces": False}
+
+
+def make_document() -> str:
+    corpus = make_corpus(per_kind=4)
+    prompts = [p for prompts in corpus.values() for p in prompts]
+    parts, size, i = [], 0, 0
+    while size < TARGET_CHARS:
+        parts.append(prompts[i % len(prompts)])
+        size += len(parts[-1])
+        i += 1
+    return "\n".join(parts)
+
+
+def pieces(document: str):
+    for start in range(0, len(document), PIECE_CHARS):
+        yield document[start : start + PIECE_CHARS]
+
+
+def main():
+    processor = TextProcessor()
+    document = make_document()
+    print(f"document: {len(document) / 1e6:.1f} M chars")
+    print(
+        f"{'mode':>22} {'first (s)':>10} {'total (s)':>10} {'peak MB':>8} "
+        f"{'out chars':>10}"
+    )
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = processor.trim(document, **OPTIONS)
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(
+        f"{'trim':>22} {total:>10.2f} {total:>10.2f} {peak / 1e6:>8.1f} "
+        f"{len(result):>10}"
+    )
+
+    for window_chars in (16_384, 65_536, 262_144):
+        tracemalloc.start()
+        start = time.perf_counter()
+        first = None
+        out_chars = 0
+        for piece in processor.trim_stream(
+            pieces(document), window_chars=window_chars, **OPTIONS
+        ):
+            if first is None:
+                first = time.perf_counter() - start
+            out_chars += len(piece)
+        total = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        label = f"trim_stream {window_chars // 1024}K"
+        print(
+            f"{label:>22} {first:>10.2f} {total:>10.2f} {peak / 1e6:>8.1f} "
+            f"{out_chars:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
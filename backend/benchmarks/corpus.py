@@ -0,0 +1,121 @@
+"""
+Seeded synthetic prompt corpus shared by the benchmark scripts.
+
+Four shapes of prompt that stress different parts of the trimmer: short
+chat turns, long retrieval-augmented contexts, highly repetitive logs and
+source code.
+"""
+
+import random
+from typing import Dict, List
+
+CHAT_PROMPTS = [
+    "What is the capital of France?",
+    "Can you explain the difference between a list and a tuple in Python?",
+    "Write a short, friendly email declining a meeting invitation for Friday.",
+    "Summarize the plot of Hamlet in three sentences.",
+    "How do I convert 350 degrees Fahrenheit to Celsius?",
+    "Give me five ideas for a vegetarian dinner that takes under 30 minutes.",
+    "Why is the sky blue? Please keep the answer simple.",
+    "Translate 'Where is the train station?' into Spanish and Italian.",
+]
+
+RAG_PARAGRAPHS = [
+    "The quarterly report shows revenue growth in all regions, with the "
+    "strongest increase in the European market driven by new enterprise deals.",
+    "Our return policy allows customers to return unused items within thirty "
+    "days of purchase for a full refund, excluding shipping costs.",
+    "Support tickets are answered within one business day. Urgent issues "
+    "affecting production systems are escalated to the on-call engineer.",
+    "The data retention policy keeps application logs for ninety days and "
+    "audit logs for seven years, in line with regulatory requirements.",
+    "New employees receive a laptop, access to the internal wiki and a "
+    "mentor for their first three months at the company.",
+    "The API is rate limited to one hundred requests per minute per key; "
+    "exceeding the limit returns HTTP 429 with a Retry-After header.",
+]
+
+LOG_TEMPLATES = [
+    "{ts} INFO  [worker-{w}] request completed in {ms} ms status=200 path=/api/items",
+    "{ts} INFO  [worker-{w}] cache hit for key user:{u}:profile",
+    "{ts} WARN  [worker-{w}] slow query took {ms} ms: SELECT * FROM orders WHERE id = ?",
+    "{ts} ERROR [worker-{w}] connection reset by peer while reading response body",
+    "{ts} DEBUG [worker-{w}] heartbeat ok, queue depth {q}",
+]
+
+CODE_SNIPPET = '''
+def load_config(path: str) -> dict:
+    """Read a JSON config file and fill in defaults."""
+    with open(path) as f:
+        config = json.load(f)
+    config.setdefault("timeout", 30)
+    config.setdefault("retries", 3)
+    return config
+
+
+class RetryingClient:
+    def __init__(self, session, retries: int = 3):
+        self.session = session
+        self.retries = retries
+
+    def get(self, url: str):
+        for attempt in range(self.retries):
+            try:
+                return self.session.get(url, timeout=10)
+            except ConnectionError:
+                if attempt == self.retries - 1:
+                    raise
+'''
+
+
+def short_chat(rng: random.Random) -> str:
+    return rng.choice(CHAT_PROMPTS)
+
+
+def long_rag(rng: random.Random, paragraphs: int = 60) -> str:
+    context = "\n\n".join(rng.choice(RAG_PARAGRAPHS) for _ in range(paragraphs))
+    return (
+        "You are a helpful assistant. Answer the question based only on the "
+        "context below. If the answer is not in the context, say you do not "
+        f"know.\n\nContext:\n{context}\n\nQuestion: {rng.choice(CHAT_PROMPTS)}"
+    )
+
+
+def repetitive_logs(rng: random.Random, lines: int = 400) -> str:
+    log = "\n".join(
+        rng.choice(LOG_TEMPLATES).format(
+            ts=f"2024-05-01T12:{i // 60 % 60:02d}:{i % 60:02d}Z",
+            w=rng.randint(1, 4),
+            ms=rng.randint(5, 900),
+            u=rng.randint(1000, 1010),
+            q=rng.randint(0, 9),
+        )
+        for i in range(lines)
+    )
+    return f"Find the root cause of the errors in these logs:\n{log}"
+
+
+def code(rng: random.Random, copies: int = 8) -> str:
+    snippets = [
+        CODE_SNIPPET.replace("load_config", f"load_config_{i}")
+        for i in range(copies)
+    ]
+    rng.shuffle(snippets)
+    return "Review this module and point out bugs:\n" + "".join(snippets)
+
+
+GENERATORS = {
+    "short_chat": short_chat,
+    "long_rag": long_rag,
+    "repetitive_logs": repetitive_logs,
+    "code": code,
+}
+
+
+def make_corpus(per_kind: int = 3, seed: int = 0) -> Dict[str, List[str]]:
+    """per_kind prompts of every shape, identical for a given seed"""
+    rng = random.Random(seed)
+    return {
+        kind: [generate(rng) for _ in range(per_kind)]
+        for kind, generate in GENERATORS.items()
+    }
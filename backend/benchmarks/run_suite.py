@@ -0,0 +1,309 @@
+"""
+Reproducible benchmark suite over a synthetic prompt corpus.
+
+Times SuffixArray, find_repeated_chunks, trim under every option
+combination, TokenTracker, calculate_similarity and the /optimize-prompt
+and /analyze endpoints. Endpoints run in-process against a local stub
+OpenAI server, with the response and embedding caches disabled so every
+request does the full work. Results are written as JSON so runs can be
+diffed for regressions.
+
+Run from the backend directory:
+
+    python -m benchmarks.run_suite --output bench-results.json
+    python -m benchmarks.run_suite --sections trim token_tracker --repeat 10
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+from benchmarks.corpus import make_corpus
+
+SECTIONS = [
+    "suffix_array",
+    "repeated_chunks",
+    "trim",
+    "token_tracker",
+    "similarity",
+    "endpoints",
+]
+
+TRIM_FLAGS = [
+    "remove_spaces",
+    "remove_stopwords",
+    "remove_punctuation",
+    "remove_chunks",
+]
+
+
+def measure(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Run fn once to warm up, then repeat times; seconds per run"""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "max": max(samples),
+        "runs": repeat,
+    }
+
+
+def trim_option_grid() -> List[Dict]:
+    """Every on/off combination of the trim flags, for both engines"""
+    return [
+        {**dict(zip(TRIM_FLAGS, flags)), "engine": engine}
+        for engine in ("nltk", "fast")
+        for flags in itertools.product((True, False), repeat=len(TRIM_FLAGS))
+    ]
+
+
+def bench_suffix_array(corpus, repeat):
+    from services.prompt_trimmer import SuffixArray
+
+    results = []
+    for kind, prompts in corpus.items():
+        text = "\n".join(prompts)
+        sa_builder = SuffixArray(text)
+        suffix_array = sa_builder.build_suffix_array()
+        results.append(
+            {
+                "corpus": kind,
+                "chars": len(text),
+                "suffixArray": measure(sa_builder.build_suffix_array, repeat),
+                "lcp": measure(
+                    lambda: sa_builder.build_lcp_array(suffix_array), repeat
+                ),
+            }
+        )
+    return results
+
+
+def bench_repeated_chunks(corpus, repeat, processor):
+    results = []
+    for kind, prompts in corpus.items():
+        text = "\n".join(prompts)
+        results.append(
+            {
+                "corpus": kind,
+                "chars": len(text),
+                "chunks": len(processor.find_repeated_chunks(text, min_length=15)),
+                "seconds": measure(
+                    lambda: processor.find_repeated_chunks(text, min_length=15), repeat
+                ),
+            }
+        )
+    return results
+
+
+def bench_trim(corpus, repeat, processor, tracker):
+    results = []
+    for kind, prompts in corpus.items():
+        original_tokens = sum(tracker.count_tokens_batch(prompts))
+        for options in trim_option_grid():
+            trimmed = [processor.trim(prompt, **options) for prompt in prompts]
+            results.append(
+                {
+                    "corpus": kind,
+                    "options": options,
+                    "originalTokens": original_tokens,
+                    "trimmedTokens": sum(tracker.count_tokens_batch(trimmed)),
+                    "seconds": measure(
+                        lambda: [processor.trim(p, **options) for p in prompts],
+                        repeat,
+                    ),
+                }
+            )
+    return results
+
+
+def bench_token_tracker(corpus, repeat):
+    from services.token_tracker import TokenTracker
+
+    cold = TokenTracker(memo_size=0)
+    warm = TokenTracker()
+    results = []
+    for kind, prompts in corpus.items():
+        results.append(
+            {
+                "corpus": kind,
+                "tokens": sum(cold.count_tokens_batch(prompts)),
+                "countTokens": measure(
+                    lambda: [cold.count_tokens(p) for p in prompts], repeat
+                ),
+                "countTokensBatch": measure(
+                    lambda: cold.count_tokens_batch(prompts), repeat
+                ),
+                "countTokensBatchMemoized": measure(
+                    lambda: warm.count_tokens_batch(prompts), repeat
+                ),
+            }
+        )
+    return results
+
+
+def bench_similarity(corpus, repeat):
+    from services.model_output_comparison import ModelOutputComparison
+
+    comparison = ModelOutputComparison()
+    results = []
+    for kind, prompts in corpus.items():
+        pairs = list(zip(prompts, prompts[1:] + prompts[:1]))
+        results.append(
+            {
+                "corpus": kind,
+                "pairs": len(pairs),
+                "calculateSimilarity": measure(
+                    lambda: [comparison.calculate_similarity(a, b) for a, b in pairs],
+                    repeat,
+                ),
+                "calculateSimilarityBatch": measure(
+                    lambda: comparison.calculate_similarity_batch(
+                        [a for a, _ in pairs], [b for _, b in pairs]
+                    ),
+                    repeat,
+                ),
+            }
+        )
+    return results
+
+
+def bench_endpoints(corpus, repeat, stub_latency):
+    from benchmarks.stub_openai import StubOpenAIServer
+
+    with StubOpenAIServer(latency=stub_latency) as server:
+        # main reads its configuration at import time
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        os.environ.setdefault("OPENAI_API_KEY", "stub")
+        os.environ["RESPONSE_CACHE_SIZE"] = "0"
+        os.environ["EMBEDDING_CACHE_SIZE"] = "0"
+        os.environ.pop("RESPONSE_CACHE_PATH", None)
+        os.environ.pop("EMBEDDING_CACHE_PATH", None)
+
+        from fastapi.testclient import TestClient
+
+        import main
+
+        results = []
+        with TestClient(main.app) as client:
+            for kind, prompts in corpus.items():
+
+                def optimize():
+                    return [
+                        client.post("/optimize-prompt", json={"prompt": p}).json()
+                        for p in prompts
+                    ]
+
+                answers = optimize()
+
+                def analyze():
+                    for prompt, answer in zip(prompts, answers):
+                        client.post(
+                            "/analyze",
+                            json={
+                                "originalPrompt": prompt,
+                                "optimizedPrompt": answer["optimizedPrompt"],
+                                "originalAnswer": answer["originalAnswer"],
+                                "optimizedAnswer": answer["optimizedAnswer"],
+                            },
+                        ).raise_for_status()
+
+                results.append(
+                    {
+                        "corpus": kind,
+                        "requests": len(prompts),
+                        "optimizePrompt": measure(optimize, repeat),
+                        "analyze": measure(analyze, repeat),
+                    }
+                )
+        return {
+            "stubLatencySeconds": stub_latency,
+            "stubRequests": server.requests,
+            "results": results,
+        }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--sections", nargs="+", choices=SECTIONS, default=SECTIONS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--per-kind", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--stub-latency",
+        type=float,
+        default=0.0,
+        help="seconds the stub OpenAI server waits before answering",
+    )
+    args = parser.parse_args()
+
+    corpus = make_corpus(per_kind=args.per_kind, seed=args.seed)
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeat": args.repeat,
+            "perKind": args.per_kind,
+            "seed": args.seed,
+            "corpusChars": {kind: sum(map(len, p)) for kind, p in corpus.items()},
+        },
+    }
+
+    processor = tracker = None
+    if {"repeated_chunks", "trim"} & set(args.sections):
+        from services.prompt_trimmer import TextProcessor
+        from services.token_tracker import TokenTracker
+
+        processor = TextProcessor()
+        tracker = TokenTracker()
+
+    for section in args.sections:
+        print(f"running {section}...", file=sys.stderr)
+        start = time.perf_counter()
+        if section == "suffix_array":
+            report[section] = bench_suffix_array(corpus, args.repeat)
+        elif section == "repeated_chunks":
+            report[section] = bench_repeated_chunks(corpus, args.repeat, processor)
+        elif section == "trim":
+            report[section] = bench_trim(corpus, args.repeat, processor, tracker)
+        elif section == "token_tracker":
+            report[section] = bench_token_tracker(corpus, args.repeat)
+        elif section == "similarity":
+            report[section] = bench_similarity(corpus, args.repeat)
+        elif section == "endpoints":
+            report[section] = bench_endpoints(corpus, args.repeat, args.stub_latency)
+        print(f"  {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
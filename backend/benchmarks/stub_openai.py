@@ -0,0 +1,136 @@
+"""
+Local stand-in for the OpenAI chat completions API.
+
+Answers every request with a deterministic reply (including a <score> tag
+so the GPT judge parses it) after an optional fixed delay, so endpoint
+benchmarks measure this service rather than the network. Streaming
+requests get SSE chunks followed by a usage chunk.
+
+    with StubOpenAIServer(latency=0.05) as server:
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _reply(prompt: str) -> str:
+    return (
+        f"This is a stub answer to a {len(prompt.split())}-word prompt. "
+        "<justification>stub</justification> <score>85</score>"
+    )
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        prompt = body["messages"][-1]["content"]
+        answer = _reply(prompt)
+        usage = {
+            "prompt_tokens": len(prompt.split()),
+            "completion_tokens": len(answer.split()),
+            "total_tokens": len(prompt.split()) + len(answer.split()),
+        }
+        base = {
+            "id": "chatcmpl-stub",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+        }
+
+        if body.get("stream"):
+            self._send_stream(base, answer, usage)
+            return
+
+        payload = json.dumps(
+            {
+                **base,
+                "object": "chat.completion",
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": answer},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": usage,
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_stream(self, base: dict, answer: str, usage: dict):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        chunk = {**base, "object": "chat.completion.chunk"}
+        for word in answer.split(" "):
+            event = {
+                **chunk,
+                "choices": [
+                    {
+                        "index": 0,
+                        "delta": {"content": word + " "},
+                        "finish_reason": None,
+                    }
+                ],
+            }
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+        self.wfile.write(
+            f"data: {json.dumps({**chunk, 'choices': [], 'usage': usage})}\n\n".encode()
+        )
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+
+class StubOpenAIServer:
+    """Threaded stub server on 127.0.0.1; usable as a context manager"""
+
+    def __init__(self, latency: float = 0.0, port: int = 0):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = latency
+        self.httpd.requests = 0
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def requests(self) -> int:
+        return self.httpd.requests
+
+    def start(self) -> "StubOpenAIServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "StubOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
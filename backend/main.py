@@ -1,38 +1,181 @@
 import asyncio
+import codecs
+import json
 import os
+import time
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from fastapi import FastAPI, Depends
-from pydantic import BaseModel
+from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.requests import ClientDisconnect
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 from fastapi.middleware.cors import CORSMiddleware
+from services.batch_analyzer import BatchAnalyzer
 from services.llm_service import LLMInteractionService
 from services.model_output_comparison import ModelOutputComparison
-from services.prompt_trimmer import TextProcessor
-from services.token_tracker import TokenTracker
+from services.prompt_trimmer import StreamTrimmer, TextProcessor
+from services.token_tracker import TokenComparison, TokenTracker
 from services.energy_calculator import EnergyCalculator
+from services.registry import ServiceRegistry
+from services.trim_executor import TrimExecutor, TrimExecutorBusy
+from services.ai_compressor import DEFAULT_MODEL as AI_COMPRESS_DEFAULT_MODEL
+from services.embedding_cache import EmbeddingCache
+from services.response_cache import MemoryCache, SQLiteCache, TieredCache
+from services.metrics import (
+    ENDPOINT_STAGE_SECONDS,
+    REGISTRY,
+    GaugeCollector,
+    record_savings,
+)
 
 # load OpenAI API key from .env
 load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
 
+# set WARMUP_ON_STARTUP=1 to load the embedding model before the first request
+warmup_on_startup = os.getenv("WARMUP_ON_STARTUP", "0") == "1"
+
+# response cache: in-memory LRU, plus a SQLite tier when RESPONSE_CACHE_PATH is set
+response_cache_path = os.getenv("RESPONSE_CACHE_PATH")
+response_cache = TieredCache(
+    memory=MemoryCache(
+        max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", "1024")),
+        ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL", "3600")),
+    ),
+    disk=SQLiteCache(response_cache_path) if response_cache_path else None,
+)
+
+# answer embeddings run on EMBEDDING_BACKEND (torch, onnx or onnx-int8), with
+# inputs truncated to EMBEDDING_MAX_SEQ_LENGTH tokens when set
+embedding_max_seq_length = os.getenv("EMBEDDING_MAX_SEQ_LENGTH")
+embedding_options = {
+    "backend": os.getenv("EMBEDDING_BACKEND", "torch"),
+    "max_seq_length": (
+        int(embedding_max_seq_length) if embedding_max_seq_length else None
+    ),
+}
+
+# embedding cache: in-memory LRU, plus memmap files when EMBEDDING_CACHE_PATH is set
+embedding_cache = EmbeddingCache(
+    model_name=ModelOutputComparison.embedding_name(**embedding_options),
+    max_entries=int(os.getenv("EMBEDDING_CACHE_SIZE", "10000")),
+    disk_path=os.getenv("EMBEDDING_CACHE_PATH"),
+)
+
+# SEMANTIC_CACHE=1 also serves answers for prompts whose MiniLM embedding is
+# within SEMANTIC_CACHE_THRESHOLD cosine of a cached one
+semantic_cache_options = (
+    {
+        "threshold": float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95")),
+        "capacity": int(os.getenv("SEMANTIC_CACHE_SIZE", "1000")),
+        "path": os.getenv("SEMANTIC_CACHE_PATH"),
+    }
+    if os.getenv("SEMANTIC_CACHE", "0") == "1"
+    else None
+)
+
+# /trim runs in a bounded pool; requests beyond TRIM_MAX_PENDING get a 503.
+# /trim/batch shares the limit and one pool of TRIM_BATCH_WORKERS processes;
+# a batch holds at most TRIM_BATCH_MAX_PROMPTS prompts
+trim_batch_workers = os.getenv("TRIM_BATCH_WORKERS")
+trim_batch_max_prompts = int(os.getenv("TRIM_BATCH_MAX_PROMPTS", "1000"))
+trim_executor_options = {
+    "max_workers": int(os.getenv("TRIM_WORKERS", "4")),
+    "max_pending": int(os.getenv("TRIM_MAX_PENDING", "32")),
+    "use_processes": os.getenv("TRIM_USE_PROCESSES", "0") == "1",
+    "batch_workers": int(trim_batch_workers) if trim_batch_workers else None,
+}
+# /trim/stream trims uploads in windows of about TRIM_STREAM_WINDOW characters
+trim_stream_window = int(os.getenv("TRIM_STREAM_WINDOW", "65536"))
+
+# LLM_PROVIDER=echo answers offline with canned replies (LLM_ECHO_LATENCY
+# seconds each); OpenAI clients share one pool of LLM_MAX_CONNECTIONS, and
+# LLM_TIMEOUT applies to completions and judge calls alike
+llm_options = {
+    "provider": os.getenv("LLM_PROVIDER", "openai"),
+    "model": os.getenv("LLM_MODEL", "gpt-4o-mini"),
+    "max_connections": int(os.getenv("LLM_MAX_CONNECTIONS", "100")),
+    "max_keepalive_connections": int(os.getenv("LLM_MAX_KEEPALIVE", "20")),
+    "timeout": float(os.getenv("LLM_TIMEOUT", "60")),
+    "provider_options": {"latency": float(os.getenv("LLM_ECHO_LATENCY", "0"))},
+}
+# comma-separated models a request may pick; unset allows only LLM_MODEL
+allowed_models = {
+    model.strip() for model in os.getenv("LLM_ALLOWED_MODELS", "").split(",")
+} - {""} or {llm_options["model"]}
+
+# mode="ai" compresses with LLMLingua-2; concurrent requests are batched, the
+# first waiting up to AI_COMPRESS_MAX_WAIT_MS for up to AI_COMPRESS_MAX_BATCH
+ai_compressor_options = {
+    "model_name": os.getenv("AI_COMPRESS_MODEL", AI_COMPRESS_DEFAULT_MODEL),
+    "max_batch_size": int(os.getenv("AI_COMPRESS_MAX_BATCH", "8")),
+    "max_wait": float(os.getenv("AI_COMPRESS_MAX_WAIT_MS", "10")) / 1000,
+}
+
+registry = ServiceRegistry(
+    api_key=api_key,
+    response_cache=response_cache,
+    embedding_cache=embedding_cache,
+    trim_executor_options=trim_executor_options,
+    llm_options=llm_options,
+    ai_compressor_options=ai_compressor_options,
+    semantic_cache_options=semantic_cache_options,
+    embedding_options=embedding_options,
+)
+
 
 # Inject Services
 def get_llm_service():
-    return LLMInteractionService(api_key=api_key)
+    return registry.get("llm_service")
 
 
 def get_comparison_service():
-    return ModelOutputComparison()
+    return registry.get("comparison_service")
 
 
 def get_token_tracker():
-    return TokenTracker()
+    return registry.get("token_tracker")
 
 
 def get_energy_calculator():
-    return EnergyCalculator()
+    return registry.get("energy_calculator")
+
+
+def get_text_processor():
+    return registry.get("text_processor")
+
+
+def get_trim_executor():
+    return registry.get("trim_executor")
+
 
+def get_trim_optimizer():
+    return registry.get("trim_optimizer")
 
-app = FastAPI()
+
+def get_ai_compressor():
+    return registry.get("ai_compressor")
+
+
+def get_batch_analyzer():
+    return BatchAnalyzer(
+        registry.get("comparison_service"),
+        registry.get("token_tracker"),
+        registry.get("energy_calculator"),
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if warmup_on_startup:
+        await asyncio.to_thread(registry.warm_up)
+    yield
+    await registry.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -51,6 +194,7 @@ class GreenGPTResponse(BaseModel):
     optimizedAnswer: str
     originalAnswer: str
     isCached: bool = False
+    trimOptions: Optional[dict] = None  # settings chosen in "adaptive" mode
 
 
 class AnalysisResponse(BaseModel):
@@ -66,6 +210,13 @@ class AnalysisResponse(BaseModel):
 
 class PromptRequest(BaseModel):
     prompt: str = "Example prompt"
+    # "adaptive" searches trim settings for the most savings whose prompt
+    # embedding stays above similarityThreshold; "ai" compresses with
+    # LLMLingua-2, keeping about compressionRate of the tokens
+    mode: Literal["default", "adaptive", "ai"] = "default"
+    similarityThreshold: float = 0.9
+    compressionRate: float = 0.5
+    model: Optional[str] = None  # defaults to LLM_MODEL
 
 
 class AnalyzePromptRequest(BaseModel):
@@ -75,34 +226,428 @@ class AnalyzePromptRequest(BaseModel):
     optimizedAnswer: str = "Optimized Answer"
 
 
+class BatchAnalyzeRequest(BaseModel):
+    items: List[AnalyzePromptRequest]
+
+
+class BatchItemAnalysis(BaseModel):
+    similarityScoreCosine: float
+    originalTokens: int
+    optimizedTokens: int
+    tokenSavings: int
+    tokenSavingsPercentage: float
+    energySavedWatts: float
+    costSavedDollars: float
+
+
+class BatchAnalysisResponse(BaseModel):
+    items: List[BatchItemAnalysis]
+    aggregate: BatchItemAnalysis
+
+
+class TrimOptions(BaseModel):
+    stemmer: Optional[str] = None
+    removeSpaces: bool = True
+    removeStopwords: bool = True
+    removePunctuation: bool = True
+    removeChunks: bool = True
+    minChunkLength: int = 15
+    minChunkOccurrences: int = 2
+    keepFirstChunk: bool = True
+    chunkUnit: str = "chars"
+    engine: str = "nltk"
+
+    def to_kwargs(self) -> dict:
+        return {
+            "stemmer": self.stemmer,
+            "remove_spaces": self.removeSpaces,
+            "remove_stopwords": self.removeStopwords,
+            "remove_punctuation": self.removePunctuation,
+            "remove_chunks": self.removeChunks,
+            "min_chunk_length": self.minChunkLength,
+            "min_chunk_occurrences": self.minChunkOccurrences,
+            "keep_first_chunk": self.keepFirstChunk,
+            "chunk_unit": self.chunkUnit,
+            "engine": self.engine,
+        }
+
+
+class TrimRequest(BaseModel):
+    prompt: str = "Example prompt"
+    options: TrimOptions = TrimOptions()
+
+
+class TrimResponse(BaseModel):
+    trimmedPrompt: str
+    originalTokens: int
+    trimmedTokens: int
+    tokenSavings: int
+    tokenSavingsPercentage: float
+    # tokens removed by chunk deduplication, when chunkUnit is "tokens"
+    chunkTokensRemoved: Optional[int] = None
+
+
+class TrimBatchRequest(BaseModel):
+    prompts: List[str] = Field(max_length=trim_batch_max_prompts)
+    options: TrimOptions = TrimOptions()
+    # processes the batch may use at once, capped at the trim pool's size
+    workers: Optional[int] = Field(None, ge=1)
+
+
+class TrimBatchResponse(BaseModel):
+    trimmedPrompts: List[str]
+
+
+def utf8_safe(text: str) -> str:
+    """Replace lone surrogates, which JSON bodies may carry but UTF-8 cannot"""
+    return text.encode("utf-16", "surrogatepass").decode("utf-16", "replace")
+
+
+def check_model(model: Optional[str]):
+    if model and model not in allowed_models:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Model {model!r} is not one of {sorted(allowed_models)}",
+        )
+
+
+async def trim_prompt(trim_executor: TrimExecutor, prompt: str, **options):
+    """Trim off the event loop; a full executor is a 503, bad options a 400"""
+    try:
+        return await trim_executor.trim(prompt, **options)
+    except TrimExecutorBusy as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400, detail=" ".join(str(arg) for arg in e.args)
+        )
+
+
 @app.post("/optimize-prompt", response_model=GreenGPTResponse)
 async def optimize_prompt(
     request: PromptRequest,
     llm_service: LLMInteractionService = Depends(get_llm_service),
+    trim_executor: TrimExecutor = Depends(get_trim_executor),
 ):
-
-    AI_COMPRESS = False
-    if AI_COMPRESS:
-        from services.prompt_trimmer2 import trim
-
-        trimmed_prompt = trim(request.prompt)
+    check_model(request.model)
+
+    trim_options = None
+    if request.mode == "ai":
+        # resolved here rather than via Depends: the model is optional and
+        # only loaded once an "ai" request arrives, in a thread since
+        # building it loads BERT weights
+        try:
+            ai_compressor = await asyncio.to_thread(get_ai_compressor)
+        except ImportError as e:
+            raise HTTPException(
+                status_code=503, detail=f"AI compression is unavailable: {e}"
+            )
+        with ENDPOINT_STAGE_SECONDS.time(
+            endpoint="/optimize-prompt", stage="ai_compress"
+        ):
+            try:
+                trimmed_prompt = await ai_compressor.compress(
+                    request.prompt, rate=request.compressionRate
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+    elif request.mode == "adaptive":
+        # the optimizer needs the embedding model; only adaptive requests
+        # load it, and off the event loop
+        try:
+            trim_optimizer = await asyncio.to_thread(get_trim_optimizer)
+        except ImportError as e:
+            raise HTTPException(
+                status_code=503, detail=f"Adaptive trimming is unavailable: {e}"
+            )
+        with ENDPOINT_STAGE_SECONDS.time(
+            endpoint="/optimize-prompt", stage="adaptive_search"
+        ):
+            try:
+                search = await trim_optimizer.search(
+                    request.prompt, request.similarityThreshold
+                )
+            except TrimExecutorBusy as e:
+                raise HTTPException(
+                    status_code=503, detail=str(e), headers={"Retry-After": "1"}
+                )
+        trimmed_prompt = search.best.text
+        trim_options = search.best.options
     else:
-        processor = TextProcessor()
-        trimmed_prompt = processor.trim(request.prompt)
-
-    original_answer, optimized_answer = await asyncio.gather(
-        llm_service.get_answer(request.prompt), llm_service.get_answer(trimmed_prompt)
-    )
+        with ENDPOINT_STAGE_SECONDS.time(endpoint="/optimize-prompt", stage="trim"):
+            trimmed_prompt = (await trim_prompt(trim_executor, request.prompt)).text
+
+    with ENDPOINT_STAGE_SECONDS.time(endpoint="/optimize-prompt", stage="answers"):
+        (original_answer, original_cached), (optimized_answer, optimized_cached) = (
+            await asyncio.gather(
+                llm_service.get_answer_cached(
+                    request.prompt, namespace="original", model=request.model
+                ),
+                llm_service.get_answer_cached(
+                    trimmed_prompt, namespace="trimmed", model=request.model
+                ),
+            )
+        )
 
     response = GreenGPTResponse(
         optimizedPrompt=trimmed_prompt,
         optimizedAnswer=optimized_answer,
         originalAnswer=original_answer,
-        isCached=False,
+        isCached=original_cached and optimized_cached,
+        trimOptions=trim_options,
     )
     return response
 
 
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/optimize-prompt/stream")
+async def optimize_prompt_stream(
+    request: PromptRequest,
+    llm_service: LLMInteractionService = Depends(get_llm_service),
+    trim_executor: TrimExecutor = Depends(get_trim_executor),
+):
+    """
+    Server-sent events: one "trimmed" event with the optimized prompt, then
+    interleaved "token" events for both answers, then a "done" event with
+    time-to-first-token per stream.
+    """
+    check_model(request.model)
+    trimmed_prompt = (await trim_prompt(trim_executor, request.prompt)).text
+
+    async def events():
+        started = time.perf_counter()
+        yield sse_event("trimmed", {"optimizedPrompt": trimmed_prompt})
+
+        queue: asyncio.Queue = asyncio.Queue()
+        time_to_first_token = {"original": None, "optimized": None}
+        cached = {"original": False, "optimized": False}
+
+        async def pump(name: str, prompt: str, namespace: str):
+            try:
+                async for delta, is_cached in llm_service.stream_answer(
+                    prompt, namespace=namespace, model=request.model
+                ):
+                    if time_to_first_token[name] is None:
+                        time_to_first_token[name] = time.perf_counter() - started
+                    cached[name] = is_cached
+                    await queue.put(("token", {"stream": name, "content": delta}))
+            except Exception as e:
+                await queue.put(("error", {"stream": name, "message": str(e)}))
+            finally:
+                await queue.put(None)
+
+        tasks = [
+            asyncio.create_task(pump("original", request.prompt, "original")),
+            asyncio.create_task(pump("optimized", trimmed_prompt, "trimmed")),
+        ]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                item = await queue.get()
+                if item is None:
+                    remaining -= 1
+                    continue
+                yield sse_event(*item)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        yield sse_event(
+            "done",
+            {
+                "timeToFirstTokenSeconds": time_to_first_token,
+                "totalSeconds": time.perf_counter() - started,
+                "isCached": cached["original"] and cached["optimized"],
+            },
+        )
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/trim", response_model=TrimResponse)
+async def trim(
+    req: TrimRequest,
+    trim_executor: TrimExecutor = Depends(get_trim_executor),
+    token_tracker: TokenTracker = Depends(get_token_tracker),
+):
+    result = await trim_prompt(trim_executor, req.prompt, **req.options.to_kwargs())
+
+    if result.original_tokens is None:
+        token_comparison = await asyncio.to_thread(
+            token_tracker.compare, req.prompt, result.text
+        )
+    else:
+        # token-mode chunk removal already encoded the prompt
+        trimmed_tokens = await asyncio.to_thread(
+            token_tracker.count_tokens, result.text
+        )
+        token_comparison = TokenComparison.from_counts(
+            result.original_tokens, trimmed_tokens
+        )
+    return TrimResponse(
+        trimmedPrompt=utf8_safe(result.text),
+        originalTokens=token_comparison.original_tokens,
+        trimmedTokens=token_comparison.optimized_tokens,
+        tokenSavings=token_comparison.token_savings,
+        tokenSavingsPercentage=token_comparison.token_savings_percentage,
+        chunkTokensRemoved=result.chunk_tokens_removed,
+    )
+
+
+@app.post("/trim/batch", response_model=TrimBatchResponse)
+async def trim_batch(
+    req: TrimBatchRequest,
+    trim_executor: TrimExecutor = Depends(get_trim_executor),
+):
+    try:
+        trimmed_prompts = await trim_executor.trim_many(
+            req.prompts, workers=req.workers, **req.options.to_kwargs()
+        )
+    except TrimExecutorBusy as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400, detail=" ".join(str(arg) for arg in e.args)
+        )
+    return TrimBatchResponse(trimmedPrompts=trimmed_prompts)
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body generator may still be reading the request.
+
+    The stock class listens for client disconnects on the receive channel
+    while streaming, which would swallow the upload's body messages; here
+    the generator reads them, and a disconnect surfaces there instead. A
+    failed send still becomes ClientDisconnect, and background tasks run
+    even when streaming fails, so they can release what the upload held.
+    """
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        finally:
+            await self.body_iterator.aclose()
+            if self.background is not None:
+                await self.background()
+
+
+@app.post("/trim/stream")
+async def trim_stream(
+    request: Request,
+    options: TrimOptions = Depends(),
+    processor: TextProcessor = Depends(get_text_processor),
+    trim_executor: TrimExecutor = Depends(get_trim_executor),
+):
+    """
+    Trim a UTF-8 text upload of any size, sent as the raw request body.
+
+    Options are query parameters named like TrimOptions. Trimmed text is
+    streamed back window by window while the upload is still arriving. The
+    upload holds one trim executor slot throughout and its windows are
+    trimmed on the executor's threads.
+    """
+    try:
+        trimmer = StreamTrimmer(
+            processor, window_chars=trim_stream_window, **options.to_kwargs()
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400, detail=" ".join(str(arg) for arg in e.args)
+        )
+    try:
+        lease = trim_executor.lease()
+    except TrimExecutorBusy as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
+
+    async def trimmed():
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        async for data in request.stream():
+            text = decoder.decode(data)
+            for piece in await lease.run(trimmer.feed, text):
+                yield piece
+        tail = decoder.decode(b"", final=True)
+        for piece in await lease.run(lambda: trimmer.feed(tail) + trimmer.finish()):
+            yield piece
+
+    return UploadStreamingResponse(
+        trimmed(),
+        media_type="text/plain; charset=utf-8",
+        background=BackgroundTask(lease.release),
+    )
+
+
+def existing_stats(name: str) -> Optional[dict]:
+    """
+    stats() of a service that has already been built, else None. Stats are
+    read on the event loop, so they must never trigger a model load.
+    """
+    instance = registry.peek(name)
+    return instance.stats() if instance is not None else None
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return {
+        "responseCache": response_cache.stats(),
+        "embeddingCache": embedding_cache.stats(),
+        "semanticCache": existing_stats("semantic_cache"),
+        "stemCache": TextProcessor.stem_cache_info(),
+        "trimExecutor": existing_stats("trim_executor"),
+        "llmSingleFlight": existing_stats("llm_service"),
+    }
+
+
+def cache_hit_ratios():
+    """(cache,) -> hit ratio samples for the /metrics gauge"""
+    caches = {
+        f"response_{tier}": stats
+        for tier, stats in response_cache.stats().items()
+    }
+    caches["embedding"] = embedding_cache.stats()
+    caches["stem"] = TextProcessor.stem_cache_info()
+    semantic_stats = existing_stats("semantic_cache")
+    if semantic_stats is not None:
+        caches["semantic"] = semantic_stats
+    for name, stats in caches.items():
+        hits = stats["hits"] + stats.get("diskHits", 0)
+        lookups = hits + stats["misses"]
+        yield (name,), hits / lookups if lookups else 0.0
+
+
+REGISTRY.register(
+    GaugeCollector(
+        "tokenterminator_cache_hit_ratio",
+        "Hit ratio of each cache since startup",
+        ("cache",),
+        cache_hit_ratios,
+    )
+)
+
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4"
+    )
+
+
+async def timed_stage(stage: str, awaitable):
+    with ENDPOINT_STAGE_SECONDS.time(endpoint="/analyze", stage=stage):
+        return await awaitable
+
+
 @app.post("/analyze", response_model=AnalysisResponse)
 async def analyze(
     req: AnalyzePromptRequest,
@@ -111,20 +656,50 @@ async def analyze(
     energy_calculator: EnergyCalculator = Depends(get_energy_calculator),
 ):
 
-    similarity_score_cosine = comparison_service.calculate_similarity(
-        req.originalAnswer, req.optimizedAnswer
-    )
-    similarity_score_gpt = comparison_service.gpt_similarity(
-        req.originalPrompt, req.originalAnswer, req.optimizedAnswer
-    )
-    original_tokens = token_tracker.count_tokens(req.originalPrompt)
-    optimized_tokens = token_tracker.count_tokens(req.optimizedPrompt)
-    token_savings = token_tracker.optimized_tokens(
-        req.originalPrompt, req.optimizedPrompt
-    )
-    token_savings_percentage = token_tracker.calculate_token_savings_percentage(
-        req.originalPrompt, req.optimizedPrompt
+    async def no_score():
+        return 0.0
+
+    # embedding similarity and token counts run in worker threads while the
+    # GPT judge awaits its round-trip; no answer to compare means no scoring
+    has_optimized = req.optimizedPrompt != "None"
+    (
+        similarity_score_cosine,
+        similarity_score_gpt,
+        token_comparison,
+    ) = await asyncio.gather(
+        timed_stage(
+            "similarity",
+            (
+                asyncio.to_thread(
+                    comparison_service.calculate_similarity,
+                    req.originalAnswer,
+                    req.optimizedAnswer,
+                )
+                if has_optimized
+                else no_score()
+            ),
+        ),
+        timed_stage(
+            "judge",
+            (
+                comparison_service.gpt_similarity_async(
+                    req.originalPrompt, req.originalAnswer, req.optimizedAnswer
+                )
+                if has_optimized
+                else no_score()
+            ),
+        ),
+        timed_stage(
+            "tokens",
+            asyncio.to_thread(
+                token_tracker.compare, req.originalPrompt, req.optimizedPrompt
+            ),
+        ),
     )
+    original_tokens = token_comparison.original_tokens
+    optimized_tokens = token_comparison.optimized_tokens
+    token_savings = token_comparison.token_savings
+    token_savings_percentage = token_comparison.token_savings_percentage
     energy_saved_watts = energy_calculator.calculate_energy_saving(token_savings)
     cost_saved_dollars = energy_calculator.calculate_cost_saving(token_savings)
 
@@ -132,6 +707,7 @@ async def analyze(
 
         energy_saved_watts = energy_calculator.calculate_energy_saving(original_tokens)
         cost_saved_dollars = energy_calculator.calculate_cost_saving(original_tokens)
+        record_savings(token_savings, energy_saved_watts, cost_saved_dollars)
 
         return AnalysisResponse(
             similarityScoreCosine=0,
@@ -144,6 +720,7 @@ async def analyze(
             costSavedDollars=cost_saved_dollars,
         )
 
+    record_savings(token_savings, energy_saved_watts, cost_saved_dollars)
     response = AnalysisResponse(
         similarityScoreCosine=similarity_score_cosine,
         similarityScoreGPT=similarity_score_gpt,
@@ -155,3 +732,46 @@ async def analyze(
         costSavedDollars=cost_saved_dollars,
     )
     return response
+
+
+@app.post("/analyze/batch", response_model=BatchAnalysisResponse)
+async def analyze_batch(
+    req: BatchAnalyzeRequest,
+    batch_analyzer: BatchAnalyzer = Depends(get_batch_analyzer),
+):
+    result = await asyncio.to_thread(
+        batch_analyzer.analyze,
+        [
+            (
+                item.originalPrompt,
+                item.optimizedPrompt,
+                item.originalAnswer,
+                item.optimizedAnswer,
+            )
+            for item in req.items
+        ],
+    )
+
+    def to_response(item) -> BatchItemAnalysis:
+        return BatchItemAnalysis(
+            similarityScoreCosine=item.similarity_score_cosine,
+            originalTokens=item.original_tokens,
+            optimizedTokens=item.optimized_tokens,
+            tokenSavings=item.token_savings,
+            tokenSavingsPercentage=item.token_savings_percentage,
+            energySavedWatts=item.energy_saved_watts,
+            costSavedDollars=item.cost_saved_dollars,
+        )
+
+    return BatchAnalysisResponse(
+        items=[to_response(item) for item in result.items],
+        aggregate=BatchItemAnalysis(
+            similarityScoreCosine=result.mean_similarity_score_cosine,
+            originalTokens=result.original_tokens,
+            optimizedTokens=result.optimized_tokens,
+            tokenSavings=result.token_savings,
+            tokenSavingsPercentage=result.token_savings_percentage,
+            energySavedWatts=result.energy_saved_watts,
+            costSavedDollars=result.cost_saved_dollars,
+        ),
+    )
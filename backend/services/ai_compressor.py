@@ -0,0 +1,131 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from services.metrics import AI_COMPRESS_BATCH_SIZE, AI_COMPRESS_SECONDS
+
+DEFAULT_MODEL = "microsoft/llmlingua-2-bert-base-multilingual-cased-meetingbank"
+
+_Key = Tuple[float, Tuple[str, ...]]
+
+
+class AICompressor:
+    """
+    LLMLingua-2 prompt compression on CPU with micro-batching.
+
+    The token classifier is loaded once and all forward passes run on a
+    single worker thread. Concurrent compress() calls are queued; the first
+    one waits at most max_wait seconds for up to max_batch_size - 1 more,
+    and calls with the same settings then share one compress_prompt call,
+    which classifies all their chunks in batched forward passes. LLMLingua-2
+    keeps a percentile of each chunk's tokens, so a text compresses the
+    same alone or in a batch.
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL,
+        max_batch_size: int = 8,
+        max_wait: float = 0.01,
+        force_tokens: Sequence[str] = ("\n", "?", "."),
+    ):
+        # llmlingua pulls in torch and transformers; import it only when AI
+        # compression is actually used
+        from llmlingua import PromptCompressor
+
+        self.model_name = model_name
+        self.compressor = PromptCompressor(
+            model_name=model_name,
+            use_llmlingua2=True,
+            device_map="cpu",
+        )
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.force_tokens = tuple(force_tokens)
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="lingua"
+        )
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def compress_batch(
+        self, texts: List[str], rate: float = 0.5, force_tokens: Sequence[str] = ()
+    ) -> List[str]:
+        """Compress texts in one compress_prompt call; blocking"""
+        with AI_COMPRESS_SECONDS.time(model=self.model_name):
+            result = self.compressor.compress_prompt(
+                texts,
+                rate=rate,
+                force_tokens=list(force_tokens or self.force_tokens),
+                use_context_level_filter=False,
+            )
+        return result["compressed_prompt_list"]
+
+    async def compress(
+        self, text: str, rate: float = 0.5, force_tokens: Sequence[str] = ()
+    ) -> str:
+        """Compress text, sharing a forward pass with concurrent callers"""
+        if not 0 < rate <= 1:
+            raise ValueError(f"rate must be in (0, 1], got {rate}")
+        if not text.strip():
+            return text
+
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(((rate, tuple(force_tokens)), text, future))
+        return await future
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            AI_COMPRESS_BATCH_SIZE.observe(len(batch))
+
+            groups: Dict[_Key, list] = {}
+            for key, text, future in batch:
+                groups.setdefault(key, []).append((text, future))
+
+            for (rate, force_tokens), items in groups.items():
+                try:
+                    compressed = await loop.run_in_executor(
+                        self._executor,
+                        self.compress_batch,
+                        [text for text, _ in items],
+                        rate,
+                        force_tokens,
+                    )
+                except Exception as e:
+                    for _, future in items:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                for (_, future), text in zip(items, compressed):
+                    if not future.done():
+                        future.set_result(text)
+
+    def shutdown(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
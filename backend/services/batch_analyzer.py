@@ -0,0 +1,111 @@
+from dataclasses import dataclass, field
+from typing import List, Sequence, Tuple
+
+from services.energy_calculator import EnergyCalculator
+from services.model_output_comparison import ModelOutputComparison
+from services.token_tracker import TokenTracker
+
+
+@dataclass
+class PairAnalysis:
+    similarity_score_cosine: float
+    original_tokens: int
+    optimized_tokens: int
+    token_savings: int
+    token_savings_percentage: float
+    energy_saved_watts: float
+    cost_saved_dollars: float
+
+
+@dataclass
+class BatchAnalysis:
+    items: List[PairAnalysis] = field(default_factory=list)
+    mean_similarity_score_cosine: float = 0.0
+    original_tokens: int = 0
+    optimized_tokens: int = 0
+    token_savings: int = 0
+    token_savings_percentage: float = 0.0
+    energy_saved_watts: float = 0.0
+    cost_saved_dollars: float = 0.0
+
+
+class BatchAnalyzer:
+    """
+    Offline scoring of many (prompt, answer) pairs.
+
+    Each item is a tuple (original_prompt, optimized_prompt, original_answer,
+    optimized_answer). Like /analyze, an optimized prompt of "None" means the
+    prompt was dropped entirely: it scores 0 and saves all original tokens.
+    """
+
+    def __init__(
+        self,
+        comparison_service: ModelOutputComparison,
+        token_tracker: TokenTracker,
+        energy_calculator: EnergyCalculator,
+    ):
+        self.comparison_service = comparison_service
+        self.token_tracker = token_tracker
+        self.energy_calculator = energy_calculator
+
+    def analyze(self, pairs: Sequence[Tuple[str, str, str, str]]) -> BatchAnalysis:
+        similarities = self.comparison_service.calculate_similarity_batch(
+            [original_answer for _, _, original_answer, _ in pairs],
+            [optimized_answer for _, _, _, optimized_answer in pairs],
+        )
+
+        token_counts = self.token_tracker.count_tokens_batch(
+            [original_prompt for original_prompt, _, _, _ in pairs]
+            + [optimized_prompt for _, optimized_prompt, _, _ in pairs]
+        )
+
+        result = BatchAnalysis()
+        for i, ((_, optimized_prompt, _, _), similarity) in enumerate(
+            zip(pairs, similarities)
+        ):
+            original_tokens = token_counts[i]
+            if optimized_prompt == "None":
+                similarity = 0.0
+                optimized_tokens = 0
+            else:
+                optimized_tokens = token_counts[len(pairs) + i]
+
+            token_savings = max(original_tokens - optimized_tokens, 0)
+            percentage = (
+                (original_tokens - optimized_tokens) / original_tokens * 100
+                if original_tokens
+                else 0.0
+            )
+            item = PairAnalysis(
+                similarity_score_cosine=float(similarity),
+                original_tokens=original_tokens,
+                optimized_tokens=optimized_tokens,
+                token_savings=token_savings,
+                token_savings_percentage=percentage,
+                energy_saved_watts=self.energy_calculator.calculate_energy_saving(
+                    token_savings
+                ),
+                cost_saved_dollars=self.energy_calculator.calculate_cost_saving(
+                    token_savings
+                ),
+            )
+            result.items.append(item)
+
+            result.original_tokens += item.original_tokens
+            result.optimized_tokens += item.optimized_tokens
+            result.token_savings += item.token_savings
+            result.energy_saved_watts += item.energy_saved_watts
+            result.cost_saved_dollars += item.cost_saved_dollars
+
+        if result.items:
+            result.mean_similarity_score_cosine = float(
+                sum(item.similarity_score_cosine for item in result.items)
+                / len(result.items)
+            )
+        if result.original_tokens:
+            result.token_savings_percentage = (
+                (result.original_tokens - result.optimized_tokens)
+                / result.original_tokens
+                * 100
+            )
+        return result
@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+KEY_BYTES = 16
+
+
+def embedding_key(model_name: str, text: str) -> bytes:
+    return hashlib.blake2b(
+        # surrogatepass: JSON bodies may carry lone surrogates
+        f"{model_name}\0{text}".encode("utf-8", "surrogatepass"),
+        digest_size=KEY_BYTES,
+    ).digest()
+
+
+class MemmapEmbeddingStore:
+    """
+    Fixed-capacity on-disk embedding store backed by NumPy memmaps.
+
+    <path>.vectors holds float32 rows, <path>.keys the content hash of each
+    row and <path>.meta.json the dimension and next row to write. Once full,
+    the oldest rows are overwritten.
+
+    Processes sharing a path (uvicorn --workers N) each keep their own row
+    index and write position, so they may overwrite each other's rows. A
+    row is only returned while its stored key still matches; an entry lost
+    that way is a miss, never another text's vector.
+    """
+
+    def __init__(self, path: str, dim: int, capacity: int = 100_000):
+        self.path = path
+        meta_path = f"{path}.meta.json"
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta["dim"] != dim:
+                raise ValueError(
+                    f"{path} holds {meta['dim']}-d embeddings, expected {dim}-d"
+                )
+            capacity = meta["capacity"]
+            self.next_row = meta["next_row"]
+            mode = "r+"
+        else:
+            self.next_row = 0
+            mode = "w+"
+
+        self.dim = dim
+        self.capacity = capacity
+        self.vectors = np.memmap(
+            f"{path}.vectors", dtype=np.float32, mode=mode, shape=(capacity, dim)
+        )
+        self.keys = np.memmap(
+            f"{path}.keys", dtype=np.uint8, mode=mode, shape=(capacity, KEY_BYTES)
+        )
+        self.rows: Dict[bytes, int] = {
+            bytes(key): row for row, key in enumerate(self.keys) if key.any()
+        }
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        row = self.rows.get(key)
+        if row is None:
+            return None
+        # checked on both sides of the copy: put() clears the key first
+        if bytes(self.keys[row]) == key:
+            vector = np.array(self.vectors[row])
+            if bytes(self.keys[row]) == key:
+                return vector
+        del self.rows[key]
+        return None
+
+    def put(self, key: bytes, vector: np.ndarray):
+        if key in self.rows:
+            return
+        row = self.next_row % self.capacity
+        old_key = bytes(self.keys[row])
+        if self.rows.get(old_key) == row:
+            del self.rows[old_key]
+
+        self.keys[row] = 0
+        self.vectors[row] = vector
+        self.keys[row] = np.frombuffer(key, dtype=np.uint8)
+        self.rows[key] = row
+        self.next_row += 1
+
+    def flush(self):
+        self.vectors.flush()
+        self.keys.flush()
+        with open(f"{self.path}.meta.json", "w") as f:
+            json.dump(
+                {"dim": self.dim, "capacity": self.capacity, "next_row": self.next_row},
+                f,
+            )
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+class EmbeddingCache:
+    """
+    Content-addressed cache of float32 embeddings.
+
+    An in-memory LRU sits in front of an optional memmap store on disk that
+    survives restarts. Lookups are keyed by a hash of (model, text).
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_entries: int = 10_000,
+        disk_path: Optional[str] = None,
+        disk_capacity: int = 100_000,
+    ):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self.disk_capacity = disk_capacity
+        self.disk: Optional[MemmapEmbeddingStore] = None
+        self._entries: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _remember(self, key: bytes, vector: np.ndarray):
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        keys = [embedding_key(self.model_name, text) for text in texts]
+        vectors: List[Optional[np.ndarray]] = []
+        with self._lock:
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                else:
+                    vector = self.disk.get(key) if self.disk is not None else None
+                    if vector is not None:
+                        self._remember(key, vector)
+                        self.disk_hits += 1
+                    else:
+                        self.misses += 1
+                vectors.append(vector)
+        return vectors
+
+    def put_many(self, texts: Sequence[str], vectors: np.ndarray):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            if self.disk is None and self.disk_path:
+                self.disk = MemmapEmbeddingStore(
+                    self.disk_path, vectors.shape[1], self.disk_capacity
+                )
+            for text, vector in zip(texts, vectors):
+                key = embedding_key(self.model_name, text)
+                # a row view would keep the caller's whole batch alive
+                self._remember(key, vector.copy())
+                if self.disk is not None:
+                    self.disk.put(key, vector)
+            if self.disk is not None:
+                self.disk.flush()
+
+    def open_disk(self, dim: int):
+        """Open the disk store up front so earlier runs' vectors are found"""
+        if self.disk_path and self.disk is None:
+            with self._lock:
+                self.disk = MemmapEmbeddingStore(
+                    self.disk_path, dim, self.disk_capacity
+                )
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "diskEntries": len(self.disk) if self.disk is not None else 0,
+                "hits": self.hits,
+                "diskHits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
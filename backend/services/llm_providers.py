@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+
+@dataclass
+class Usage:
+    prompt_tokens: int
+    completion_tokens: int
+
+
+@dataclass
+class Completion:
+    """A full answer, or one streamed piece of it; usage may be missing"""
+
+    text: str
+    usage: Optional[Usage] = None
+
+
+class LLMProvider(ABC):
+    """Interface for chat completion backends"""
+
+    name = ""
+
+    @abstractmethod
+    async def complete(
+        self,
+        prompt: str,
+        model: str,
+        temperature: float,
+        system: Optional[str] = None,
+    ) -> Completion:
+        """Answer prompt as the user message, after an optional system message"""
+
+    @abstractmethod
+    def stream(
+        self, prompt: str, model: str, temperature: float
+    ) -> AsyncIterator[Completion]:
+        """Yield text pieces; the last piece may carry usage and no text"""
+
+    async def aclose(self):
+        pass
+
+
+class OpenAIProvider(LLMProvider):
+    """
+    OpenAI chat completions. Pass a shared httpx.AsyncClient to pool
+    connections with other services; it is then left open by aclose().
+    """
+
+    name = "openai"
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        timeout: float = 60.0,
+        max_retries: int = 2,
+    ):
+        self.http_client = http_client
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=http_client,
+            timeout=timeout,
+            max_retries=max_retries,
+        )
+
+    async def complete(
+        self,
+        prompt: str,
+        model: str,
+        temperature: float,
+        system: Optional[str] = None,
+    ) -> Completion:
+        messages = [{"role": "user", "content": prompt}]
+        if system is not None:
+            messages.insert(0, {"role": "system", "content": system})
+        response = await self.client.chat.completions.create(
+            messages=messages,
+            model=model,
+            temperature=temperature,
+        )
+        return Completion(response.choices[0].message.content, response.usage)
+
+    async def stream(
+        self, prompt: str, model: str, temperature: float
+    ) -> AsyncIterator[Completion]:
+        stream = await self.client.chat.completions.create(
+            messages=[{"role": "user", "content": prompt}],
+            model=model,
+            temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                # the final chunk carries usage and no choices
+                yield Completion("", getattr(chunk, "usage", None))
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield Completion(delta)
+
+    async def aclose(self):
+        if self.http_client is None:
+            await self.client.close()
+
+
+class EchoProvider(LLMProvider):
+    """
+    Deterministic offline stand-in: answers with a canned reply derived from
+    the prompt, after an optional delay, so load tests need no network.
+    Prompts asking for a <score> tag, like the similarity judge's, get a
+    score derived from the same digest.
+    """
+
+    name = "echo"
+
+    def __init__(self, latency: float = 0.0, token_latency: float = 0.0):
+        self.latency = latency
+        self.token_latency = token_latency
+
+    @staticmethod
+    def _reply(prompt: str, model: str) -> str:
+        digest = hashlib.sha256(
+            prompt.encode("utf-8", "surrogatepass")
+        ).hexdigest()[:8]
+        words = prompt.split()
+        preview = " ".join(words[:20])
+        reply = f"[{model} echo {digest}] {len(words)} words: {preview}"
+        if "<score>" in prompt:
+            reply += f" <score>{int(digest, 16) % 101}</score>"
+        return reply
+
+    @staticmethod
+    def _usage(prompt: str, answer: str) -> Usage:
+        return Usage(len(prompt.split()), len(answer.split()))
+
+    async def complete(
+        self,
+        prompt: str,
+        model: str,
+        temperature: float,
+        system: Optional[str] = None,
+    ) -> Completion:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        answer = self._reply(prompt, model)
+        return Completion(answer, self._usage(prompt, answer))
+
+    async def stream(
+        self, prompt: str, model: str, temperature: float
+    ) -> AsyncIterator[Completion]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        answer = self._reply(prompt, model)
+        for i, word in enumerate(answer.split(" ")):
+            if self.token_latency:
+                await asyncio.sleep(self.token_latency)
+            yield Completion(word if i == 0 else " " + word)
+        yield Completion("", self._usage(prompt, answer))
+
+
+PROVIDERS = {
+    OpenAIProvider.name: OpenAIProvider,
+    EchoProvider.name: EchoProvider,
+}
+
+
+def make_provider(name: str, **options) -> LLMProvider:
+    if name not in PROVIDERS:
+        raise ValueError(
+            f"Unknown LLM provider {name!r}, expected one of {sorted(PROVIDERS)}"
+        )
+    return PROVIDERS[name](**options)
@@ -1,18 +1,159 @@
-from openai import AsyncOpenAI
+import asyncio
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from services.llm_providers import Completion, LLMProvider, OpenAIProvider
+from services.metrics import (
+    LLM_CALLS_AVOIDED,
+    LLM_CALLS_COALESCED,
+    LLM_REQUEST_SECONDS,
+    record_usage,
+)
+from services.response_cache import CacheBackend, make_cache_key
+from services.semantic_cache import SemanticCache
 
 
 class LLMInteractionService:
-    def __init__(self, api_key: str):
-        self.client = AsyncOpenAI(
-            api_key=api_key,
-        )
-
-    async def get_answer(self, prompt: str) -> str:
-        response = await self.client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model="gpt-4o-mini",
-            temperature=0.3,  # Lower temperature for more consistent scoring
-        )
-
-        result = response.choices[0].message.content
-        return result
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache: Optional[CacheBackend] = None,
+        model: str = "gpt-4o-mini",
+        temperature: float = 0.3,  # Lower temperature for more consistent scoring
+        provider: Optional[LLMProvider] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+    ):
+        self.provider = provider or OpenAIProvider(api_key=api_key)
+        self.cache = cache
+        self.semantic_cache = semantic_cache
+        self.model = model
+        self.temperature = temperature
+        # completions in flight, keyed by (model, temperature, prompt)
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.completions = 0
+        self.coalesced = 0
+
+    async def get_answer(
+        self, prompt: str, namespace: str = "original", model: Optional[str] = None
+    ) -> str:
+        answer, _ = await self.get_answer_cached(prompt, namespace, model)
+        return answer
+
+    async def get_answer_cached(
+        self, prompt: str, namespace: str = "original", model: Optional[str] = None
+    ) -> Tuple[str, bool]:
+        """
+        Return (answer, is_cached). The namespace keeps answers for original and
+        trimmed prompts apart even when the prompt text is identical. model
+        overrides the service default for this call.
+        """
+        model = model or self.model
+        key = make_cache_key(model, self.temperature, prompt, namespace)
+        if self.cache is not None:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                LLM_CALLS_AVOIDED.inc(cache="exact")
+                return cached, True
+
+        scope = vector = None
+        if self.semantic_cache is not None:
+            scope = self.semantic_cache.scope(namespace, model, self.temperature)
+            vector, cached = await self._semantic_lookup(prompt, scope)
+            if cached is not None:
+                return cached, True
+
+        completion = await self._complete_once(prompt, model)
+        result = completion.text
+        if result is not None:
+            await self._remember(key, result, vector, scope)
+        return result, False
+
+    async def _complete_once(self, prompt: str, model: str) -> Completion:
+        """
+        Single-flight completion: concurrent calls for the same model,
+        temperature and prompt share one provider request, whatever their
+        namespace. The request runs as its own task, so a cancelled caller
+        does not cancel it for the others.
+        """
+        key = make_cache_key(model, self.temperature, prompt, namespace="")
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._complete(prompt, model))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish_flight(key, done))
+            self.completions += 1
+        else:
+            self.coalesced += 1
+            LLM_CALLS_COALESCED.inc(model=model)
+        return await asyncio.shield(task)
+
+    def _finish_flight(self, key: str, task: asyncio.Task):
+        self._in_flight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every caller went away
+
+    async def _complete(self, prompt: str, model: str) -> Completion:
+        with LLM_REQUEST_SECONDS.time(model=model, purpose="completion"):
+            completion = await self.provider.complete(prompt, model, self.temperature)
+        record_usage(model, "completion", completion.usage)
+        return completion
+
+    def stats(self) -> dict:
+        return {
+            "inFlight": len(self._in_flight),
+            "completions": self.completions,
+            "coalesced": self.coalesced,
+        }
+
+    async def stream_answer(
+        self, prompt: str, namespace: str = "original", model: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, bool]]:
+        """
+        Yield (text_delta, is_cached) pieces of the answer as they arrive.
+        A cached answer is yielded in one piece; a streamed answer is cached
+        once it has completed.
+        """
+        model = model or self.model
+        key = make_cache_key(model, self.temperature, prompt, namespace)
+        if self.cache is not None:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                LLM_CALLS_AVOIDED.inc(cache="exact")
+                yield cached, True
+                return
+
+        scope = vector = None
+        if self.semantic_cache is not None:
+            scope = self.semantic_cache.scope(namespace, model, self.temperature)
+            vector, cached = await self._semantic_lookup(prompt, scope)
+            if cached is not None:
+                yield cached, True
+                return
+
+        parts = []
+        async for piece in self.provider.stream(prompt, model, self.temperature):
+            if piece.usage is not None:
+                record_usage(model, "stream", piece.usage)
+            if piece.text:
+                parts.append(piece.text)
+                yield piece.text, False
+
+        await self._remember(key, "".join(parts), vector, scope)
+
+    async def _semantic_lookup(self, prompt: str, scope: str):
+        """(prompt embedding, cached answer or None); embedding runs in a thread"""
+        vector = await asyncio.to_thread(self.semantic_cache.embed, prompt)
+        match = self.semantic_cache.lookup(vector, scope)
+        if match is None:
+            return vector, None
+        LLM_CALLS_AVOIDED.inc(cache="semantic")
+        return vector, match[0]
+
+    async def _remember(self, key: str, answer: str, vector, scope: Optional[str]):
+        if self.cache is not None:
+            await self.cache.aset(key, answer)
+        if self.semantic_cache is not None and vector is not None:
+            if self.semantic_cache.add(vector, answer, scope):
+                await asyncio.to_thread(self.semantic_cache.save)
+
+    async def aclose(self):
+        await self.provider.aclose()
@@ -0,0 +1,294 @@
+"""
+Minimal Prometheus-style metrics rendered in the text exposition format.
+
+Metrics are process-local. Trims that run in a process pool are not
+recorded by the serving process.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(
+    names: Sequence[str], values: Sequence[str], extra: str = ""
+) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: (bucket counts, sum, count)
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._label_values(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = {
+                key: (list(counts), total, count)
+                for key, (counts, total, count) in self._values.items()
+            }
+        lines = self.header()
+        for key, (counts, total, count) in sorted(values.items()):
+            for bound, bucket_count in zip(self.buckets, counts):
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class GaugeCollector:
+    """Gauge whose samples are computed at scrape time by a callback"""
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Iterable[Tuple[LabelValues, float]]],
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for key, value in self.collect():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+TRIM_PHASE_SECONDS = REGISTRY.register(
+    Histogram(
+        "tokenterminator_trim_phase_seconds",
+        "Time spent in each TextProcessor.trim phase",
+        ("phase", "engine"),
+    )
+)
+TOKENIZER_SECONDS = REGISTRY.register(
+    Histogram(
+        "tokenterminator_tiktoken_seconds",
+        "Time spent counting tokens with tiktoken",
+        ("operation",),
+    )
+)
+EMBEDDING_SECONDS = REGISTRY.register(
+    Histogram(
+        "tokenterminator_embedding_seconds",
+        "Time spent encoding texts with the sentence embedding model",
+        ("model",),
+    )
+)
+LLM_REQUEST_SECONDS = REGISTRY.register(
+    Histogram(
+        "tokenterminator_llm_request_seconds",
+        "Latency of LLM API calls",
+        ("model", "purpose"),
+    )
+)
+ENDPOINT_STAGE_SECONDS = REGISTRY.register(
+    Histogram(
+        "tokenterminator_endpoint_stage_seconds",
+        "Time spent in each stage of an API endpoint",
+        ("endpoint", "stage"),
+    )
+)
+AI_COMPRESS_SECONDS = REGISTRY.register(
+    Histogram(
+        "tokenterminator_ai_compress_seconds",
+        "Time spent in one batched LLMLingua compress_prompt call",
+        ("model",),
+    )
+)
+AI_COMPRESS_BATCH_SIZE = REGISTRY.register(
+    Histogram(
+        "tokenterminator_ai_compress_batch_size",
+        "Requests collected into one AI compression micro-batch",
+        buckets=(1, 2, 4, 8, 16, 32, 64),
+    )
+)
+LLM_TOKENS = REGISTRY.register(
+    Counter(
+        "tokenterminator_llm_tokens_total",
+        "Tokens reported in the usage field of LLM responses",
+        ("model", "purpose", "kind"),
+    )
+)
+LLM_CALLS_AVOIDED = REGISTRY.register(
+    Counter(
+        "tokenterminator_llm_calls_avoided_total",
+        "Completions served from a cache instead of the LLM",
+        ("cache",),
+    )
+)
+LLM_CALLS_COALESCED = REGISTRY.register(
+    Counter(
+        "tokenterminator_llm_calls_coalesced_total",
+        "Completions that joined an identical request already in flight",
+        ("model",),
+    )
+)
+TOKENS_SAVED = REGISTRY.register(
+    Counter(
+        "tokenterminator_tokens_saved_total",
+        "Prompt tokens saved by optimization, as scored by /analyze",
+    )
+)
+ENERGY_SAVED = REGISTRY.register(
+    Counter(
+        "tokenterminator_energy_saved_watt_hours_total",
+        "Estimated energy saved, from EnergyCalculator",
+    )
+)
+COST_SAVED = REGISTRY.register(
+    Counter(
+        "tokenterminator_cost_saved_dollars_total",
+        "Estimated cost saved, from EnergyCalculator",
+    )
+)
+
+
+def record_usage(model: str, purpose: str, usage) -> None:
+    """Count prompt and completion tokens from an OpenAI usage object"""
+    if usage is None:
+        return
+    for kind, tokens in (
+        ("prompt", usage.prompt_tokens),
+        ("completion", usage.completion_tokens),
+    ):
+        LLM_TOKENS.inc(tokens or 0, model=model, purpose=purpose, kind=kind)
+
+
+def record_savings(token_savings: int, energy_saved: float, cost_saved: float) -> None:
+    TOKENS_SAVED.inc(token_savings)
+    ENERGY_SAVED.inc(energy_saved)
+    COST_SAVED.inc(cost_saved)
@@ -1,16 +1,159 @@
+import logging
 import os
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
-from openai import OpenAI
+from typing import List, Optional
+
+import httpx
+import numpy as np
+
+from services.embedding_cache import EmbeddingCache
+from services.llm_providers import LLMProvider, OpenAIProvider
+from services.metrics import EMBEDDING_SECONDS, LLM_REQUEST_SECONDS, record_usage
+
+logger = logging.getLogger(__name__)
+
+# sentence-transformers loading options per embedding backend; the ONNX ones
+# need `pip install "sentence-transformers[onnx]"`
+EMBEDDING_BACKENDS = {
+    "torch": {},
+    "onnx": {"backend": "onnx"},
+    # dynamically quantized int8 export shipped with the hub model
+    "onnx-int8": {
+        "backend": "onnx",
+        "model_kwargs": {"file_name": "onnx/model_quint8_avx2.onnx"},
+    },
+}
 
 
 class ModelOutputComparison:
-    def __init__(self):
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+    model_name = "all-MiniLM-L6-v2"
+
+    def __init__(
+        self,
+        judge_provider: Optional[LLMProvider] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        judge_model: str = "gpt-4o-mini",
+        judge_timeout: float = 30.0,
+        judge_max_retries: int = 3,
+        http_client: Optional[httpx.AsyncClient] = None,
+        backend: str = "torch",
+        max_seq_length: Optional[int] = None,
+    ):
+        if backend not in EMBEDDING_BACKENDS:
+            raise ValueError(
+                f"unknown embedding backend {backend!r}, "
+                f"expected one of {sorted(EMBEDDING_BACKENDS)}"
+            )
+        # sentence-transformers pulls in torch; import it only when the
+        # comparison service is actually constructed
+        from sentence_transformers import SentenceTransformer
+
+        self.backend = backend
+        self.embedding_id = self.embedding_name(backend, max_seq_length)
+        self.model = SentenceTransformer(
+            self.model_name, **EMBEDDING_BACKENDS[backend]
+        )
+        if max_seq_length is not None:
+            # longer inputs are truncated; attention cost grows with length
+            self.model.max_seq_length = max_seq_length
+        self.embedding_cache = embedding_cache
+        if embedding_cache is not None:
+            embedding_cache.open_disk(self.model.get_sentence_embedding_dimension())
+        self.judge_model = judge_model
+        self.judge_timeout = judge_timeout
+        self.judge_max_retries = judge_max_retries
+        self.http_client = http_client
+        # a provider passed in is shared, e.g. the registry's LLM provider,
+        # so LLM_PROVIDER=echo keeps the judge offline too
+        self._judge_provider = judge_provider
+        self._owns_judge_provider = judge_provider is None
+
+    @classmethod
+    def embedding_name(
+        cls, backend: str = "torch", max_seq_length: Optional[int] = None
+    ) -> str:
+        """
+        Name for the vectors a configuration produces, used as the embedding
+        cache namespace; the default configuration keeps the bare model name.
+        """
+        name = cls.model_name
+        if backend != "torch":
+            name += f":{backend}"
+        if max_seq_length is not None:
+            name += f":{max_seq_length}"
+        return name
+
+    @property
+    def judge_provider(self) -> LLMProvider:
+        """The given provider, else an OpenAI one built on first use"""
+        if self._judge_provider is None:
+            self._judge_provider = OpenAIProvider(
+                api_key=os.environ.get("OPENAI_API_KEY"),
+                http_client=self.http_client,
+                timeout=self.judge_timeout,
+                max_retries=self.judge_max_retries,
+            )
+        return self._judge_provider
+
+    async def aclose(self):
+        # a provider passed in belongs to whoever passed it
+        if self._judge_provider is not None and self._owns_judge_provider:
+            await self._judge_provider.aclose()
+            self._judge_provider = None
+
+    def encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """
+        Normalized float32 embeddings for texts, one row per text.
+
+        Cached vectors are reused and only the misses go through the model,
+        in a single batched encode call.
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        if self.embedding_cache is None:
+            return self._encode(texts, batch_size)
+
+        vectors = self.embedding_cache.get_many(texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            # duplicates within one call are encoded once
+            missing_texts = list(dict.fromkeys(texts[i] for i in missing))
+            encoded = self._encode(missing_texts, batch_size)
+            self.embedding_cache.put_many(missing_texts, encoded)
+            by_text = dict(zip(missing_texts, encoded))
+            for i in missing:
+                vectors[i] = by_text[texts[i]]
+        return np.stack(vectors)
+
+    def _encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        with EMBEDDING_SECONDS.time(model=self.embedding_id):
+            return self.model.encode(
+                texts,
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+            ).astype(np.float32, copy=False)
 
     def calculate_similarity(self, original: str, optimized: str) -> float:
-        embeddings = self.model.encode([original, optimized])
-        return cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
+        original_embedding, optimized_embedding = self.encode([original, optimized])
+        return float(np.dot(original_embedding, optimized_embedding))
+
+    def calculate_similarity_batch(
+        self, originals: List[str], optimized: List[str], batch_size: int = 64
+    ) -> np.ndarray:
+        """
+        Paired cosine similarity for many (original, optimized) texts.
+
+        All texts go through a single encode call with normalized embeddings,
+        so the scores are one row-wise dot product.
+        """
+        if len(originals) != len(optimized):
+            raise ValueError("originals and optimized must have the same length")
+        if not originals:
+            return np.zeros(0, dtype=np.float32)
+
+        embeddings = self.encode(list(originals) + list(optimized), batch_size)
+        n = len(originals)
+        return np.einsum("ij,ij->i", embeddings[:n], embeddings[n:])
 
     comparison_prompt = """
 You are tasked with calculating a similarity score between two answers provided by a language model (LLM) in response to a given question. Your goal is to determine how similar the answers are in terms of content, focusing on whether important facts, concepts, and arguments are present in both responses.
@@ -65,56 +208,56 @@ Your response should follow this format:
 
 <score>[Your similarity score from 0 to 100]</score>"""
 
-    def gpt_similarity(
+    judge_system_prompt = "You are an expert at analyzing and comparing text responses."
+
+    def _judge_prompt(
         self, question: str, original_answer: str, optimized_answer: str
-    ) -> float:
-        formatted_prompt = (
+    ) -> str:
+        return (
             self.comparison_prompt.replace("{{QUESTION}}", question)
             .replace("{{ANSWER1}}", original_answer)
             .replace("{{ANSWER2}}", optimized_answer)
         )
 
-        client = OpenAI(
-            api_key=os.environ.get("OPENAI_API_KEY"),
-        )
+    def _parse_score(self, result: str) -> float:
+        logger.debug("Comparison service response: %s", result)
 
         try:
-            response = client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert at analyzing and comparing text responses.",
-                    },
-                    {"role": "user", "content": formatted_prompt},
-                ],
-                model="gpt-4o-mini",
-                temperature=0.3,  # Lower temperature for more consistent scoring
-            )
-
-            result = response.choices[0].message.content
-
-            print("Got the following response from the comparision Service:", result)
+            score_start = result.find("<score>") + len("<score>")
+            score_end = result.find("</score>")
 
-            try:
-                score_start = result.find("<score>") + len("<score>")
-                score_end = result.find("</score>")
+            if score_start == -1 or score_end == -1:
+                raise ValueError("Score tags not found in response")
 
-                if score_start == -1 or score_end == -1:
-                    raise ValueError("Score tags not found in response")
+            score_text = result[score_start:score_end].strip()
+            score = float(score_text)
 
-                score_text = result[score_start:score_end].strip()
-                score = float(score_text)
+            if not (0 <= score <= 100):
+                raise ValueError(f"Score {score} is outside valid range [0, 100]")
 
-                if not (0 <= score <= 100):
-                    raise ValueError(f"Score {score} is outside valid range [0, 100]")
+            return float(score / 100)
 
-                return float(score / 100)
+        except (ValueError, IndexError) as e:
+            logger.warning("Error extracting score: %s. Full response: %s", e, result)
+            return 0.0
 
-            except (ValueError, IndexError) as e:
-                print(f"Error extracting score: {str(e)}")
-                print(f"Full response: {result}")
-                return 0.0
+    async def gpt_similarity_async(
+        self, question: str, original_answer: str, optimized_answer: str
+    ) -> float:
+        """LLM-judged similarity score in [0, 1], from the judge provider"""
+        try:
+            with LLM_REQUEST_SECONDS.time(model=self.judge_model, purpose="judge"):
+                completion = await self.judge_provider.complete(
+                    self._judge_prompt(question, original_answer, optimized_answer),
+                    model=self.judge_model,
+                    # Lower temperature for more consistent scoring
+                    temperature=0.3,
+                    system=self.judge_system_prompt,
+                )
+            record_usage(self.judge_model, "judge", completion.usage)
+
+            return self._parse_score(completion.text)
 
         except Exception as e:
-            print(f"Error during API call: {str(e)}")
+            logger.error("Error during API call: %s", e)
             return 0.0
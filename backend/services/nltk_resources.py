@@ -0,0 +1,82 @@
+"""
+Offline NLTK data for the prompt trimmer.
+
+The punkt tokenizer and stopword lists are bundled into ``nltk_data`` next
+to ``main.py`` when the image is built (``python -m services.nltk_resources``),
+so nothing is downloaded while serving requests. Set NLTK_DATA_DIR to use a
+different bundle location; data installed in NLTK's standard locations is
+used when the bundle lacks it.
+"""
+
+import os
+import threading
+from typing import List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NLTK_DATA_DIR = os.getenv("NLTK_DATA_DIR", os.path.join(BACKEND_DIR, "nltk_data"))
+
+REQUIRED_RESOURCES = {
+    "punkt": "tokenizers/punkt",
+    "punkt_tab": "tokenizers/punkt_tab",
+    "stopwords": "corpora/stopwords",
+}
+
+_ready = False
+_lock = threading.Lock()
+
+
+def missing_resources(paths: Optional[List[str]] = None) -> list:
+    """Resources found neither in paths nor, by default, bundle then nltk.data.path"""
+    import nltk
+
+    if paths is None:
+        paths = [NLTK_DATA_DIR] + [p for p in nltk.data.path if p != NLTK_DATA_DIR]
+    missing = []
+    for name, path in REQUIRED_RESOURCES.items():
+        try:
+            nltk.data.find(path, paths=paths)
+        except LookupError:
+            missing.append(name)
+    return missing
+
+
+def ensure_nltk_data():
+    """Point NLTK at the local bundle and verify it contains every resource"""
+    global _ready
+    if _ready:
+        return
+
+    with _lock:
+        if _ready:
+            return
+
+        import nltk
+
+        if NLTK_DATA_DIR not in nltk.data.path:
+            nltk.data.path.insert(0, NLTK_DATA_DIR)
+
+        missing = missing_resources()
+        if missing:
+            raise LookupError(
+                f"NLTK resources {missing} not found in {NLTK_DATA_DIR} or "
+                "NLTK's data path. "
+                "Run `python -m services.nltk_resources` to bundle them."
+            )
+        _ready = True
+
+
+def download_bundle():
+    import nltk
+
+    os.makedirs(NLTK_DATA_DIR, exist_ok=True)
+    for name in REQUIRED_RESOURCES:
+        nltk.download(name, download_dir=NLTK_DATA_DIR, quiet=True)
+
+    missing = missing_resources(paths=[NLTK_DATA_DIR])
+    if missing:
+        raise SystemExit(f"Failed to bundle NLTK resources: {missing}")
+    print(f"NLTK resources available in {NLTK_DATA_DIR}")
+
+
+if __name__ == "__main__":
+    download_bundle()
@@ -1,13 +1,17 @@
+import hashlib
+import os
 import re
-from typing import Optional, List, Tuple
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from typing import Iterable, Iterator, Optional, List, Sequence, Tuple, Union
 
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import PorterStemmer, SnowballStemmer, LancasterStemmer
+import numpy as np
 
-nltk.download("punkt", quiet=True)
-nltk.download("stopwords", quiet=True)
-nltk.download("punkt_tab", quiet=True)
+from services.metrics import TRIM_PHASE_SECONDS
+from services.nltk_resources import ensure_nltk_data
 
 ARTICLES_PREPOSITIONS = {
     "english": ["the", "a", "an", "in", "on", "at", "for", "to", "of"]
@@ -58,21 +62,77 @@ NEGATION_WORDS = {
     ],
 }
 
+# per-process (stemmer, language, word) -> stem cache
+STEM_CACHE_SIZE = int(os.getenv("STEM_CACHE_SIZE", "65536"))
+
 PUNCTUATION = [".", ",", "'", '"', "!", "?", ";", ":", "-"]
+PUNCTUATION_SET = frozenset(PUNCTUATION)
+
+# Single-pass approximation of nltk.word_tokenize for the "fast" engine.
+# Like the Treebank tokenizer it keeps hyphenated words and numbers such as
+# 1,000 or 3.14 together, splits off other punctuation and rewrites double
+# quotes as `` (opening) and '' (closing). Commas and colons only stay
+# inside a token when followed by a digit.
+FAST_OPEN_QUOTE_PATTERN = re.compile(r'(?<![^\s(\[{<])"')
+FAST_TOKEN_PATTERN = re.compile(r"``|''|\.\.\.|--|\w+(?:[-./]\w+|[,:]\d+)*|[^\w\s]")
+
+# Where trim_stream may cut a window and split it into segments: after
+# sentence-ending punctuation followed by whitespace, or at a line break
+SEGMENT_END_PATTERN = re.compile(r"(?<=[.!?])\s+|\n+")
 
 
 class SuffixArray:
-    """Helper class for building suffix arrays and LCP arrays"""
+    """Helper class for building suffix arrays and LCP arrays over text or token IDs"""
 
-    def __init__(self, text: str):
+    def __init__(self, text: Union[str, Sequence[int]]):
         self.text = text
         self.n = len(text)
 
     def build_suffix_array(self) -> List[int]:
-        """Build suffix array using prefix doubling"""
-        suffixes = [(self.text[i:], i) for i in range(self.n)]
-        suffixes.sort()
-        return [pos for _, pos in suffixes]
+        """
+        Build suffix array using prefix doubling over integer ranks
+
+        Suffixes are never materialised: each round sorts positions by the
+        pair (rank[i], rank[i + k]) and re-ranks, doubling k until all ranks
+        are distinct. A missing second half ranks as -1, so a suffix that is
+        a prefix of another sorts first, exactly like comparing the strings.
+        """
+        n = self.n
+        if n == 0:
+            return []
+
+        if isinstance(self.text, str):
+            # surrogatepass: JSON bodies may carry lone surrogates
+            code_points = self.text.encode("utf-32-le", "surrogatepass")
+            rank = np.frombuffer(code_points, dtype=np.uint32)
+            rank = rank.astype(np.int64)
+        else:
+            rank = np.asarray(self.text, dtype=np.int64)
+        suffix_array = np.argsort(rank, kind="stable")
+
+        k = 1
+        while True:
+            second = np.full(n, -1, dtype=np.int64)
+            if k < n:
+                second[: n - k] = rank[k:]
+
+            suffix_array = np.lexsort((second, rank))
+            sorted_first = rank[suffix_array]
+            sorted_second = second[suffix_array]
+
+            new_rank_sorted = np.zeros(n, dtype=np.int64)
+            new_rank_sorted[1:] = np.cumsum(
+                (sorted_first[1:] != sorted_first[:-1])
+                | (sorted_second[1:] != sorted_second[:-1])
+            )
+            rank = np.empty(n, dtype=np.int64)
+            rank[suffix_array] = new_rank_sorted
+
+            if new_rank_sorted[-1] == n - 1 or k >= n:
+                break
+            k *= 2
+
+        return suffix_array.tolist()
 
     def build_lcp_array(self, suffix_array: List[int]) -> List[int]:
         """Build LCP array using Kasai's algorithm"""
@@ -100,22 +160,120 @@ class SuffixArray:
         return lcp
 
 
+@dataclass
+class TrimResult:
+    text: str
+    # only known when chunk_unit="tokens", where they fall out of the encode
+    original_tokens: Optional[int] = None
+    chunk_tokens_removed: Optional[int] = None
+
+
+class IntervalSet:
+    """Sorted, disjoint half-open intervals with O(log m) overlap queries"""
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+
+    def overlaps(self, start: int, end: int) -> bool:
+        """Whether [start, end) shares any position with a stored interval"""
+        idx = bisect_right(self.starts, start) - 1
+        if idx >= 0 and self.ends[idx] > start:
+            return True
+        return idx + 1 < len(self.starts) and self.starts[idx + 1] < end
+
+    def add(self, start: int, end: int):
+        """Insert [start, end), merging with any touching or overlapping interval"""
+        lo = bisect_left(self.ends, start)
+        hi = bisect_right(self.starts, end)
+        if lo < hi:
+            start = min(start, self.starts[lo])
+            end = max(end, self.ends[hi - 1])
+        self.starts[lo:hi] = [start]
+        self.ends[lo:hi] = [end]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
 class TextProcessor:
     """
     Enhanced text processor with trimming and integrated chunk removal
     """
 
-    def __init__(self, language: str = "english"):
+    def __init__(self, language: str = "english", encoder=None):
+        # nltk takes seconds to import, so it is only loaded once a
+        # processor is actually needed
+        ensure_nltk_data()
+        from nltk.corpus import stopwords
+
         self.language = language
+        self.encoder = encoder
         if language not in stopwords.fileids():
             raise ValueError("Unsupported language")
 
         self.nltk_stopwords = stopwords.words(language)
-        self.words_to_exclude = set(
-            self.nltk_stopwords + ARTICLES_PREPOSITIONS.get(language, [])
-        ) - set(NEGATION_WORDS.get(language, []))
+        self.words_to_exclude = frozenset(
+            set(self.nltk_stopwords + ARTICLES_PREPOSITIONS.get(language, []))
+            - set(NEGATION_WORDS.get(language, []))
+        )
+
+    def trim(self, text: str, **kwargs) -> str:
+        """Trim text and return only the result; see trim_with_stats for options"""
+        return self.trim_with_stats(text, **kwargs).text
+
+    def trim_stream(
+        self,
+        pieces: Iterable[str],
+        window_chars: int = 65_536,
+        seen_capacity: int = 100_000,
+        **kwargs,
+    ) -> Iterator[str]:
+        """
+        Trim a document that arrives in pieces, yielding trimmed text as it goes
+
+        See StreamTrimmer for how windows are formed and repeats are found
+        across them. Concatenating the yielded strings gives the result.
+        """
+        trimmer = StreamTrimmer(self, window_chars, seen_capacity, **kwargs)
+        for piece in pieces:
+            yield from trimmer.feed(piece)
+        yield from trimmer.finish()
 
-    def trim(
+    def trim_many(
+        self,
+        texts: Sequence[str],
+        workers: Optional[int] = None,
+        chunksize: Optional[int] = None,
+        **kwargs,
+    ) -> List[str]:
+        """
+        Trim many texts in parallel, returning results in input order
+
+        Work is sharded across a process pool whose workers each build their
+        own TextProcessor once. workers is capped at the CPU count. kwargs
+        are passed to trim() for every text. TrimExecutor.trim_many runs
+        batches on a long-lived pool instead of one per call.
+        """
+        texts = list(texts)
+        cpu_count = os.cpu_count() or 1
+        workers = min(workers or cpu_count, cpu_count)
+        if workers == 1 or len(texts) <= 1:
+            return [self.trim(text, **kwargs) for text in texts]
+
+        workers = min(workers, len(texts))
+        if chunksize is None:
+            chunksize = max(1, len(texts) // (workers * 4))
+
+        with make_trim_pool(self.language, workers) as executor:
+            return [
+                result.text
+                for result in executor.map(
+                    partial(_trim_in_worker, options=kwargs), texts, chunksize=chunksize
+                )
+            ]
+
+    def trim_with_stats(
         self,
         text: str,
         stemmer: Optional[str] = None,
@@ -126,71 +284,207 @@ class TextProcessor:
         min_chunk_length: int = 15,
         min_chunk_occurrences: int = 2,
         keep_first_chunk: bool = True,  # Keep the first occurrence of each chunk
-    ) -> str:
+        chunk_unit: str = "chars",  # "tokens" measures chunks in tiktoken IDs
+        engine: str = "nltk",  # "fast" tokenizes and filters in one regex pass
+    ) -> TrimResult:
         accepted_stemmers = ("snowball", "porter", "lancaster")
         if stemmer and stemmer not in accepted_stemmers:
             raise ValueError("Stemmer must be one of", accepted_stemmers)
 
+        accepted_chunk_units = ("chars", "tokens")
+        if chunk_unit not in accepted_chunk_units:
+            raise ValueError("Chunk unit must be one of", accepted_chunk_units)
+
+        accepted_engines = ("nltk", "fast")
+        if engine not in accepted_engines:
+            raise ValueError("Engine must be one of", accepted_engines)
+
         text = text.replace("'", "").replace("'", "")
 
-        # First pass: identify sentence boundaries and chunks
-        sentences = nltk.sent_tokenize(text)
+        # First pass: identify chunks
         processed_text = text
+        result = TrimResult(text="")
 
         if remove_chunks:
-            chunks = self.find_repeated_chunks(
-                processed_text,
-                min_length=min_chunk_length,
-                min_occurrences=min_chunk_occurrences,
+            with TRIM_PHASE_SECONDS.time(phase="chunk_detection", engine=engine):
+                if chunk_unit == "tokens":
+                    token_ids = self._get_encoder().encode(processed_text)
+                    chunks = self.find_repeated_token_chunks(
+                        token_ids,
+                        min_length=min_chunk_length,
+                        min_occurrences=min_chunk_occurrences,
+                    )
+                    spans = self._chunk_spans(
+                        self.find_non_overlapping_chunks(chunks), keep_first_chunk
+                    )
+                    processed_text, removed = self._remove_token_spans(
+                        token_ids, spans
+                    )
+                    result.original_tokens = len(token_ids)
+                    result.chunk_tokens_removed = removed
+                else:
+                    chunks = self.find_repeated_chunks(
+                        processed_text,
+                        min_length=min_chunk_length,
+                        min_occurrences=min_chunk_occurrences,
+                    )
+
+                    # Filter out overlapping chunks
+                    non_overlapping_chunks = self.find_non_overlapping_chunks(chunks)
+
+                    spans = self._chunk_spans(non_overlapping_chunks, keep_first_chunk)
+                    processed_text = self._remove_spans(processed_text, spans)
+
+        if engine == "fast":
+            words = self._fast_words(
+                processed_text, stemmer, remove_stopwords, remove_punctuation
+            )
+        else:
+            words = self._nltk_words(
+                processed_text, stemmer, remove_stopwords, remove_punctuation
             )
 
-            # Filter out overlapping chunks
-            non_overlapping_chunks = self.find_non_overlapping_chunks(chunks)
+        # Join words
+        join_str = "" if remove_spaces else " "
+        trimmed = join_str.join(words).strip()
 
-            # Sort chunks by position (reversed) to remove from end to start
-            for chunk, positions, _ in sorted(
-                non_overlapping_chunks, key=lambda x: (-x[1][0], -len(x[0]))
-            ):
-                # Skip the first occurrence if keep_first_chunk is True
-                chunk_positions = positions[1:] if keep_first_chunk else positions
-
-                for pos in sorted(chunk_positions, reverse=True):
-                    processed_text = (
-                        processed_text[:pos]
-                        + " "  # Add space to prevent word joining
-                        + processed_text[pos + len(chunk) :]
-                    )
+        # Clean up multiple spaces that might have been introduced
+        trimmed = re.sub(r"\s+", " ", trimmed)
+
+        if not remove_punctuation:
+            trimmed = re.sub(r"\s([?.!,:;])", r"\1", trimmed)
+
+        result.text = trimmed
+        return result
+
+    def _nltk_words(
+        self,
+        text: str,
+        stemmer: Optional[str],
+        remove_stopwords: bool,
+        remove_punctuation: bool,
+    ) -> List[str]:
+        import nltk
 
         # Tokenize words after chunk removal
-        tokenized = nltk.word_tokenize(processed_text)
+        with TRIM_PHASE_SECONDS.time(phase="tokenize", engine="nltk"):
+            tokenized = nltk.word_tokenize(text)
 
-        if remove_punctuation:
-            tokenized = [word for word in tokenized if word not in PUNCTUATION]
+        with TRIM_PHASE_SECONDS.time(phase="filter", engine="nltk"):
+            if remove_punctuation:
+                tokenized = [word for word in tokenized if word not in PUNCTUATION]
 
-        if remove_stopwords:
-            tokenized = [
-                word for word in tokenized if word.lower() not in self.words_to_exclude
-            ]
+            if remove_stopwords:
+                tokenized = [
+                    word
+                    for word in tokenized
+                    if word.lower() not in self.words_to_exclude
+                ]
 
         words = tokenized
 
         # Apply stemming if requested
         if stemmer:
-            stemmer_instance = self._get_stemmer(stemmer)
-            words = [stemmer_instance.stem(word) for word in tokenized]
-            words = self._restore_case(words, tokenized)
+            with TRIM_PHASE_SECONDS.time(phase="stem", engine="nltk"):
+                words = [stem_word(stemmer, self.language, word) for word in tokenized]
 
-        # Join words
-        join_str = "" if remove_spaces else " "
-        trimmed = join_str.join(words).strip()
+        return words
 
-        # Clean up multiple spaces that might have been introduced
-        trimmed = re.sub(r"\s+", " ", trimmed)
+    def _fast_words(
+        self,
+        text: str,
+        stemmer: Optional[str],
+        remove_stopwords: bool,
+        remove_punctuation: bool,
+    ) -> List[str]:
+        """Tokenize with one compiled regex and filter with one set lookup"""
+        with TRIM_PHASE_SECONDS.time(phase="tokenize", engine="fast"):
+            text = FAST_OPEN_QUOTE_PATTERN.sub(" `` ", text).replace('"', " '' ")
+            words = FAST_TOKEN_PATTERN.findall(text)
 
-        if not remove_punctuation:
-            trimmed = re.sub(r"\s([?.!,:;])", r"\1", trimmed)
+        # punctuation has no case, so one lowercase lookup covers both filters
+        excluded = frozenset()
+        if remove_punctuation:
+            excluded |= PUNCTUATION_SET
+        if remove_stopwords:
+            excluded |= self.words_to_exclude
+        if excluded:
+            with TRIM_PHASE_SECONDS.time(phase="filter", engine="fast"):
+                words = [word for word in words if word.lower() not in excluded]
+
+        if stemmer:
+            with TRIM_PHASE_SECONDS.time(phase="stem", engine="fast"):
+                words = [stem_word(stemmer, self.language, word) for word in words]
+
+        return words
+
+    def _get_encoder(self):
+        if self.encoder is None:
+            import tiktoken
+
+            self.encoder = tiktoken.encoding_for_model("gpt-3.5-turbo")
+        return self.encoder
+
+    @staticmethod
+    def _chunk_spans(
+        chunks: List[Tuple[Sequence, List[int], int]], keep_first_chunk: bool
+    ) -> List[Tuple[int, int]]:
+        spans = []
+        for chunk, positions, _ in chunks:
+            # Skip the first occurrence if keep_first_chunk is True
+            chunk_positions = positions[1:] if keep_first_chunk else positions
+            spans.extend((pos, pos + len(chunk)) for pos in chunk_positions)
+        return spans
+
+    @staticmethod
+    def _merge_spans(spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        merged = []
+        for start, end in sorted(spans):
+            if merged and start < merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    def _remove_token_spans(
+        self, token_ids: List[int], spans: List[Tuple[int, int]]
+    ) -> Tuple[str, int]:
+        """
+        Drop token spans and decode what is left; returns (text, tokens removed)
+
+        Parts are joined as bytes: a span can start or end inside a character
+        that tiktoken split over several tokens, and the leftover bytes of
+        such a character are dropped instead of decoded to U+FFFD.
+        """
+        parts = []
+        cursor = 0
+        removed = 0
+        for start, end in self._merge_spans(spans):
+            parts.append(self.encoder.decode_bytes(token_ids[cursor:start]))
+            removed += end - start
+            cursor = end
+        parts.append(self.encoder.decode_bytes(token_ids[cursor:]))
+        return b" ".join(parts).decode("utf-8", errors="ignore"), removed
+
+    @classmethod
+    def _remove_spans(cls, text: str, spans: List[Tuple[int, int]]) -> str:
+        """
+        Replace each (start, end) span with a single space in one pass
 
-        return trimmed
+        Overlapping spans are merged first, so every character is copied at
+        most once regardless of how many occurrences are removed.
+        """
+        if not spans:
+            return text
+
+        parts = []
+        cursor = 0
+        for start, end in cls._merge_spans(spans):
+            parts.append(text[cursor:start])
+            parts.append(" ")  # Add space to prevent word joining
+            cursor = end
+        parts.append(text[cursor:])
+        return "".join(parts)
 
     def find_repeated_chunks(
         self,
@@ -216,11 +510,51 @@ class TextProcessor:
         if preprocess:
             text = self.trim(text, **preprocess_kwargs)
 
-        sa_builder = SuffixArray(text)
+        repeated_chunks = [
+            (text[start : start + length], positions, len(positions))
+            for start, length, positions in self._repeated_runs(
+                text, min_length, min_occurrences
+            )
+        ]
+        repeated_chunks.sort(key=lambda x: (-len(x[1]), -len(x[0])))
+        return repeated_chunks
+
+    def find_repeated_token_chunks(
+        self,
+        token_ids: Sequence[int],
+        min_length: int = 3,
+        min_occurrences: int = 2,
+    ) -> List[Tuple[Tuple[int, ...], List[int], int]]:
+        """
+        Find repeated runs of token IDs, ranked by the tokens they cover
+
+        Args:
+            token_ids: Encoded text
+            min_length: Minimum chunk length in tokens
+            min_occurrences: Minimum number of occurrences to report
+
+        Returns:
+            List of tuples: (token chunk, positions, occurrences)
+        """
+        repeated_chunks = [
+            (tuple(token_ids[start : start + length]), positions, len(positions))
+            for start, length, positions in self._repeated_runs(
+                token_ids, min_length, min_occurrences
+            )
+        ]
+        repeated_chunks.sort(key=lambda x: (-x[2] * len(x[0]), -len(x[0])))
+        return repeated_chunks
+
+    @staticmethod
+    def _repeated_runs(
+        sequence: Union[str, Sequence[int]], min_length: int, min_occurrences: int
+    ) -> List[Tuple[int, int, List[int]]]:
+        """Scan the LCP array for repeated runs as (start, length, positions)"""
+        sa_builder = SuffixArray(sequence)
         suffix_array = sa_builder.build_suffix_array()
         lcp_array = sa_builder.build_lcp_array(suffix_array)
 
-        repeated_chunks = []
+        runs = []
         i = 0
         while i < len(lcp_array):
             if lcp_array[i] >= min_length:
@@ -233,15 +567,13 @@ class TextProcessor:
                     j += 1
 
                 if len(positions) >= min_occurrences:
-                    chunk = text[positions[0] : positions[0] + length]
-                    repeated_chunks.append((chunk, positions, len(positions)))
+                    runs.append((positions[0], length, positions))
 
                 i = j
             else:
                 i += 1
 
-        repeated_chunks.sort(key=lambda x: (-len(x[1]), -len(x[0])))
-        return repeated_chunks
+        return runs
 
     def find_non_overlapping_chunks(
         self, chunks: List[Tuple[str, List[int], int]]
@@ -253,43 +585,173 @@ class TextProcessor:
             return []
 
         filtered_chunks = []
-        used_positions = set()
+        used_spans = IntervalSet()
 
         for chunk, positions, occurrences in chunks:
-            chunk_positions = set(range(pos, pos + len(chunk)) for pos in positions)
-            if not any(
-                pos in used_positions
-                for positions_set in chunk_positions
-                for pos in positions_set
-            ):
+            spans = [(pos, pos + len(chunk)) for pos in positions]
+            if not any(used_spans.overlaps(start, end) for start, end in spans):
                 filtered_chunks.append((chunk, positions, occurrences))
-                used_positions.update(
-                    pos for positions_set in chunk_positions for pos in positions_set
-                )
+                for start, end in spans:
+                    used_spans.add(start, end)
 
         return filtered_chunks
 
-    def _get_stemmer(self, stemmer_name: str):
-        """Get the appropriate stemmer instance"""
-        if stemmer_name == "porter":
-            return PorterStemmer()
-        elif stemmer_name == "snowball":
-            return SnowballStemmer(self.language)
-        elif stemmer_name == "lancaster":
-            return LancasterStemmer()
-
-    def _restore_case(
-        self, stemmed_words: List[str], original_words: List[str]
-    ) -> List[str]:
-        """Restore original case after stemming"""
-        case_restored = []
-        for stemmed, original in zip(stemmed_words, original_words):
-            if original.istitle():
-                stemmed = stemmed.title()
-            elif original.isupper():
-                stemmed = stemmed.upper()
-            case_restored.append(stemmed)
-        return case_restored
+    @staticmethod
+    def stem_cache_info() -> dict:
+        """Hit/miss statistics of the process-wide word -> stem cache"""
+        info = stem_word.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "entries": info.currsize,
+            "maxEntries": info.maxsize,
+            "hitRate": info.hits / lookups if lookups else 0.0,
+        }
+
+
+class StreamTrimmer:
+    """
+    Incremental state behind TextProcessor.trim_stream.
+
+    Text is buffered until window_chars have arrived, then cut at the last
+    sentence or line end and trimmed with trim_with_stats, so only one
+    window is held at a time. Suffix-array chunk removal runs within each
+    window; across windows, sentences and lines of at least
+    min_chunk_length characters are dropped if an identical one was seen
+    before, using a bounded LRU dictionary of their hashes. A first
+    occurrence may already have been emitted, so keep_first_chunk=False
+    only applies within a window.
+    """
+
+    def __init__(
+        self,
+        processor: TextProcessor,
+        window_chars: int = 65_536,
+        seen_capacity: int = 100_000,
+        **kwargs,
+    ):
+        processor.trim_with_stats("", **kwargs)  # validate options up front
+        self.processor = processor
+        self.window_chars = window_chars
+        self.seen_capacity = seen_capacity
+        self.options = kwargs
+        self.min_segment_length = kwargs.get("min_chunk_length", 15)
+        self.dedupe = kwargs.get("remove_chunks", True)
+        self.separator = "" if kwargs.get("remove_spaces", True) else " "
+        self._buffer = ""
+        self._seen: "OrderedDict[bytes, None]" = OrderedDict()
+        self._emitted = False
+        self.segments_dropped = 0
+
+    def feed(self, text: str) -> List[str]:
+        """Add text; returns trimmed output for every window completed by it"""
+        self._buffer += text
+        output = []
+        while len(self._buffer) >= self.window_chars:
+            cut = self._cut_position(self._buffer[: self.window_chars])
+            window, self._buffer = self._buffer[:cut], self._buffer[cut:]
+            output.extend(self._trim_window(window))
+        return output
+
+    def finish(self) -> List[str]:
+        """Trim whatever is still buffered"""
+        window, self._buffer = self._buffer, ""
+        return self._trim_window(window)
+
+    @staticmethod
+    def _cut_position(head: str) -> int:
+        """End of the last sentence or line in head, else its last space"""
+        cut = 0
+        for match in SEGMENT_END_PATTERN.finditer(head):
+            cut = match.end()
+        if not cut:
+            cut = head.rfind(" ") + 1
+        return cut or len(head)
+
+    def _drop_seen_segments(self, window: str) -> str:
+        kept = []
+        start = 0
+        ends = [match.end() for match in SEGMENT_END_PATTERN.finditer(window)]
+        for end in ends + [len(window)]:
+            segment = window[start:end]
+            start = end
+            key = segment.strip()
+            if len(key) < self.min_segment_length:
+                kept.append(segment)
+                continue
+
+            digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+            if digest in self._seen:
+                self._seen.move_to_end(digest)
+                self.segments_dropped += 1
+                continue
+
+            self._seen[digest] = None
+            if len(self._seen) > self.seen_capacity:
+                self._seen.popitem(last=False)
+            kept.append(segment)
+        return "".join(kept)
+
+    def _trim_window(self, window: str) -> List[str]:
+        if self.dedupe:
+            window = self._drop_seen_segments(window)
+        trimmed = self.processor.trim(window, **self.options)
+        if not trimmed:
+            return []
+        if self._emitted:
+            trimmed = self.separator + trimmed
+        self._emitted = True
+        return [trimmed]
+
+
+_worker_processor: Optional[TextProcessor] = None
+
+
+def _init_trim_worker(language: str):
+    global _worker_processor
+    _worker_processor = TextProcessor(language=language)
+
+
+def _trim_in_worker(text: str, options: dict) -> TrimResult:
+    return _worker_processor.trim_with_stats(text, **options)
+
+
+def _trim_chunk_in_worker(texts: List[str], options: dict) -> List[str]:
+    return [_trim_in_worker(text, options).text for text in texts]
+
+
+def make_trim_pool(language: str, workers: int) -> ProcessPoolExecutor:
+    """Process pool whose workers each hold a TextProcessor"""
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_trim_worker,
+        initargs=(language,),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_stemmer(stemmer_name: str, language: str = "english"):
+    """Shared stemmer instance per (stemmer, language)"""
+    from nltk.stem import PorterStemmer, SnowballStemmer, LancasterStemmer
+
+    if stemmer_name == "porter":
+        return PorterStemmer()
+    elif stemmer_name == "snowball":
+        return SnowballStemmer(language)
+    elif stemmer_name == "lancaster":
+        return LancasterStemmer()
+
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem_word(stemmer_name: str, language: str, word: str) -> str:
+    """Stem a word, keeping title or upper case of the original"""
+    stemmed = get_stemmer(stemmer_name, language).stem(word)
+    if word.istitle():
+        stemmed = stemmed.title()
+    elif word.isupper():
+        stemmed = stemmed.upper()
+    return stemmed
 
 
 def demo():
@@ -0,0 +1,169 @@
+import asyncio
+import threading
+from typing import Callable, Dict, Optional
+
+import httpx
+
+from services.ai_compressor import AICompressor
+from services.embedding_cache import EmbeddingCache
+from services.energy_calculator import EnergyCalculator
+from services.llm_providers import make_provider
+from services.llm_service import LLMInteractionService
+from services.model_output_comparison import ModelOutputComparison
+from services.prompt_trimmer import TextProcessor
+from services.response_cache import CacheBackend
+from services.semantic_cache import SemanticCache
+from services.token_tracker import TokenTracker
+from services.trim_executor import TrimExecutor
+from services.trim_optimizer import TrimOptimizer
+
+
+class ServiceRegistry:
+    """
+    Process-wide holder for the heavy service objects.
+
+    Each service is built at most once, on first use or during warm-up, and
+    the same instance is handed out to every request afterwards.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        response_cache: Optional[CacheBackend] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        trim_executor_options: Optional[dict] = None,
+        llm_options: Optional[dict] = None,
+        ai_compressor_options: Optional[dict] = None,
+        semantic_cache_options: Optional[dict] = None,
+        embedding_options: Optional[dict] = None,
+    ):
+        self.api_key = api_key
+        self.response_cache = response_cache
+        self.embedding_cache = embedding_cache
+        self.trim_executor_options = trim_executor_options or {}
+        self.llm_options = llm_options or {}
+        self.ai_compressor_options = ai_compressor_options or {}
+        self.embedding_options = embedding_options or {}
+        self._instances: Dict[str, object] = {}
+        self._lock = threading.RLock()
+        self._factories: Dict[str, Callable[[], object]] = {
+            "http_client": self._make_http_client,
+            "llm_provider": self._make_llm_provider,
+            "llm_service": lambda: LLMInteractionService(
+                cache=self.response_cache,
+                model=self.llm_options.get("model", "gpt-4o-mini"),
+                provider=self.get("llm_provider"),
+                semantic_cache=(
+                    self.get("semantic_cache")
+                    if "semantic_cache" in self._factories
+                    else None
+                ),
+            ),
+            "comparison_service": lambda: ModelOutputComparison(
+                embedding_cache=self.embedding_cache,
+                judge_provider=self.get("llm_provider"),
+                **self.embedding_options,
+            ),
+            "token_tracker": TokenTracker,
+            "energy_calculator": EnergyCalculator,
+            "text_processor": lambda: TextProcessor(
+                encoder=self.get("token_tracker").encoder
+            ),
+            "trim_executor": lambda: TrimExecutor(
+                self.get("text_processor"), **self.trim_executor_options
+            ),
+            "trim_optimizer": lambda: TrimOptimizer(
+                self.get("trim_executor"),
+                self.get("token_tracker"),
+                self.get("comparison_service"),
+            ),
+            "ai_compressor": lambda: AICompressor(**self.ai_compressor_options),
+        }
+        # no options means no semantic cache
+        if semantic_cache_options is not None:
+            self._factories["semantic_cache"] = lambda: SemanticCache(
+                encode=self.get("comparison_service").encode,
+                **semantic_cache_options,
+            )
+
+    def _make_http_client(self) -> httpx.AsyncClient:
+        """One connection pool shared by every OpenAI client"""
+        return httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.llm_options.get("max_connections", 100),
+                max_keepalive_connections=self.llm_options.get(
+                    "max_keepalive_connections", 20
+                ),
+            ),
+            timeout=self.llm_options.get("timeout", 60.0),
+        )
+
+    def _make_llm_provider(self):
+        """provider_options configure every provider except OpenAI"""
+        name = self.llm_options.get("provider", "openai")
+        if name == "openai":
+            # the SDK sends its own timeout with every request, overriding
+            # the one on the shared http_client
+            return make_provider(
+                name,
+                api_key=self.api_key,
+                http_client=self.get("http_client"),
+                timeout=self.llm_options.get("timeout", 60.0),
+            )
+        return make_provider(name, **self.llm_options.get("provider_options", {}))
+
+    def get(self, name: str):
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                instance = self._factories[name]()
+                self._instances[name] = instance
+        return instance
+
+    def peek(self, name: str):
+        """The instance if it has been built already, else None; never builds"""
+        return self._instances.get(name)
+
+    def warm_up(self):
+        """Load every service and run a tiny inference so first requests are fast"""
+        for name in self._factories:
+            # llmlingua is optional; its model loads on the first "ai" request
+            if name != "ai_compressor":
+                self.get(name)
+
+        self.get("comparison_service").calculate_similarity("warm up", "warm up")
+        self.get("token_tracker").count_tokens("warm up")
+
+    async def aclose(self):
+        """Close network clients and drop every cached instance"""
+        with self._lock:
+            instances = dict(self._instances)
+            self._instances.clear()
+
+        llm_service = instances.get("llm_service")
+        if llm_service is not None:
+            await llm_service.aclose()
+
+        semantic_cache = instances.get("semantic_cache")
+        if semantic_cache is not None:
+            await asyncio.to_thread(semantic_cache.save)
+
+        trim_executor = instances.get("trim_executor")
+        if trim_executor is not None:
+            trim_executor.shutdown()
+
+        ai_compressor = instances.get("ai_compressor")
+        if ai_compressor is not None:
+            ai_compressor.shutdown()
+
+        comparison_service = instances.get("comparison_service")
+        if comparison_service is not None:
+            await comparison_service.aclose()
+
+        http_client = instances.get("http_client")
+        if http_client is not None:
+            await http_client.aclose()
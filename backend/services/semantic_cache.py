@@ -0,0 +1,209 @@
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+Encoder = Callable[[List[str]], np.ndarray]
+
+
+class SemanticCache:
+    """
+    Answer cache keyed by prompt meaning rather than prompt text.
+
+    Prompts are embedded with a normalized sentence encoder and kept as
+    rows of one float32 matrix; a lookup is a brute-force dot product and
+    hits when the closest prompt in the same scope (namespace, model,
+    temperature) reaches the cosine threshold. When full, the least
+    recently used row is overwritten. With a path, vectors are saved to
+    <path>.npz and answers to a <path>.json sidecar, and both are reloaded
+    on start. add() reports when a save is due so callers on an event loop
+    can run save() in a thread; it snapshots under the lock and writes
+    outside it, so lookups are not held up by the disk.
+    """
+
+    def __init__(
+        self,
+        encode: Encoder,
+        threshold: float = 0.95,
+        capacity: int = 1000,
+        path: Optional[str] = None,
+        save_every: int = 32,
+    ):
+        self.encode = encode
+        self.threshold = threshold
+        self.capacity = capacity
+        self.path = path
+        self.save_every = save_every
+        self.vectors: Optional[np.ndarray] = None
+        self.last_used = np.zeros(capacity, dtype=np.int64)
+        self.scope_ids = np.zeros(capacity, dtype=np.int32)
+        self.answers: List[str] = []
+        self.scopes: List[str] = []
+        self._scope_index: Dict[str, int] = {}
+        self._clock = 0
+        self._unsaved = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if path and os.path.exists(f"{path}.npz"):
+            self._load()
+
+    @staticmethod
+    def scope(namespace: str, model: str, temperature: float) -> str:
+        return json.dumps([namespace, model, temperature])
+
+    def embed(self, prompt: str) -> np.ndarray:
+        return np.asarray(self.encode([prompt])[0], dtype=np.float32)
+
+    def lookup(self, vector: np.ndarray, scope: str) -> Optional[Tuple[str, float]]:
+        """(answer, similarity) of the closest cached prompt, if close enough"""
+        with self._lock:
+            row, score = self._best_match(vector, scope)
+            if row is None or score < self.threshold:
+                self.misses += 1
+                return None
+
+            self._clock += 1
+            self.last_used[row] = self._clock
+            self.hits += 1
+            return self.answers[row], score
+
+    def add(self, vector: np.ndarray, answer: str, scope: str) -> bool:
+        """Cache answer for the prompt vector; True when save() is due"""
+        with self._lock:
+            if self.vectors is None:
+                self.vectors = np.zeros((self.capacity, len(vector)), dtype=np.float32)
+
+            row, score = self._best_match(vector, scope)
+            if row is not None and score >= 1 - 1e-6:
+                # e.g. callers that shared one coalesced completion
+                self.answers[row] = answer
+            elif len(self.answers) < self.capacity:
+                row = len(self.answers)
+                self.answers.append(answer)
+                self.scopes.append(scope)
+            else:
+                row = int(np.argmin(self.last_used))
+                self.answers[row] = answer
+                self.scopes[row] = scope
+                self.evictions += 1
+
+            self._clock += 1
+            self.vectors[row] = vector
+            self.last_used[row] = self._clock
+            self.scope_ids[row] = self._scope_id(scope)
+
+            self._unsaved += 1
+            return bool(self.path) and self._unsaved >= self.save_every
+
+    def _best_match(
+        self, vector: np.ndarray, scope: str
+    ) -> Tuple[Optional[int], float]:
+        """Row and cosine of the closest prompt in scope; (None, -inf) if none"""
+        size = len(self.answers)
+        if not size:
+            return None, -np.inf
+        scores = self.vectors[:size] @ vector
+        scores[self.scope_ids[:size] != self._scope_id(scope)] = -np.inf
+        row = int(np.argmax(scores))
+        if scores[row] == -np.inf:
+            return None, -np.inf
+        return row, float(scores[row])
+
+    def _scope_id(self, scope: str) -> int:
+        return self._scope_index.setdefault(scope, len(self._scope_index))
+
+    def save(self):
+        """Write unsaved entries to disk; blocking, so call it from a thread"""
+        with self._save_lock:
+            with self._lock:
+                if not self.path or not self._unsaved:
+                    return
+                size = len(self.answers)
+                self._generation += 1
+                snapshot = {
+                    "generation": self._generation,
+                    "vectors": self.vectors[:size].copy(),
+                    "last_used": self.last_used[:size].copy(),
+                    "answers": list(self.answers),
+                    "scopes": list(self.scopes),
+                }
+                self._unsaved = 0
+            self._write(snapshot)
+
+    def _write(self, snapshot: Dict):
+        # answers vary wildly in length, so they go to JSON rather than a
+        # fixed-width numpy string array; the generation pairs the two files
+        with open(f"{self.path}.tmp.json", "w") as f:
+            json.dump(
+                {
+                    "generation": snapshot["generation"],
+                    "answers": snapshot["answers"],
+                    "scopes": snapshot["scopes"],
+                },
+                f,
+            )
+        np.savez(
+            f"{self.path}.tmp.npz",
+            generation=snapshot["generation"],
+            vectors=snapshot["vectors"],
+            last_used=snapshot["last_used"],
+        )
+        os.replace(f"{self.path}.tmp.json", f"{self.path}.json")
+        os.replace(f"{self.path}.tmp.npz", f"{self.path}.npz")
+
+    def _load(self):
+        with np.load(f"{self.path}.npz", allow_pickle=False) as data:
+            vectors = data["vectors"]
+            last_used = data["last_used"]
+            if "answers" in data.files:
+                # files from before the JSON sidecar
+                generation = 0
+                answers = [str(a) for a in data["answers"]]
+                scopes = [str(s) for s in data["scopes"]]
+            else:
+                generation = int(data["generation"])
+                answers = scopes = None
+
+        if answers is None:
+            try:
+                with open(f"{self.path}.json") as f:
+                    sidecar = json.load(f)
+            except (OSError, ValueError):
+                return
+            # a crash between the two replaces leaves mismatched files
+            if sidecar.get("generation") != generation:
+                return
+            answers, scopes = sidecar["answers"], sidecar["scopes"]
+
+        # keep the most recently used rows if the capacity shrank
+        order = np.argsort(last_used)[-self.capacity :]
+        vectors = vectors[order]
+        self.answers = [answers[i] for i in order]
+        self.scopes = [scopes[i] for i in order]
+        self._generation = generation
+
+        size = len(self.answers)
+        self.vectors = np.zeros((self.capacity, vectors.shape[1]), dtype=np.float32)
+        self.vectors[:size] = vectors
+        self.last_used[:size] = np.arange(1, size + 1)
+        self.scope_ids[:size] = [self._scope_id(scope) for scope in self.scopes]
+        self._clock = size
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.answers),
+                "capacity": self.capacity,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRate": self.hits / lookups if lookups else 0.0,
+            }
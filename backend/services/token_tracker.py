@@ -1,28 +1,97 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Sequence
+
 import tiktoken
 
+from services.metrics import TOKENIZER_SECONDS
+
+
+@dataclass
+class TokenComparison:
+    original_tokens: int
+    optimized_tokens: int
+    token_savings: int  # never negative
+    token_savings_percentage: float  # negative if the optimized text grew
+
+    @classmethod
+    def from_counts(
+        cls, original_tokens: int, optimized_tokens: int
+    ) -> "TokenComparison":
+        token_saving = original_tokens - optimized_tokens
+        return cls(
+            original_tokens=original_tokens,
+            optimized_tokens=optimized_tokens,
+            token_savings=token_saving if token_saving > 0 else 0,
+            token_savings_percentage=(
+                (token_saving / original_tokens) * 100 if original_tokens else 0.0
+            ),
+        )
+
 
 class TokenTracker:
-    def __init__(self, model_name: str = "gpt-3.5-turbo"):
+    def __init__(self, model_name: str = "gpt-3.5-turbo", memo_size: int = 4096):
         self.encoder = tiktoken.encoding_for_model(model_name)
+        self.memo_size = memo_size
+        self._memo: "OrderedDict[bytes, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _text_key(text: str) -> bytes:
+        # surrogatepass: JSON bodies may carry lone surrogates
+        return hashlib.blake2b(
+            text.encode("utf-8", "surrogatepass"), digest_size=16
+        ).digest()
+
+    def _memo_get(self, key: bytes):
+        with self._lock:
+            count = self._memo.get(key)
+            if count is not None:
+                self._memo.move_to_end(key)
+            return count
+
+    def _memo_set(self, key: bytes, count: int):
+        with self._lock:
+            self._memo[key] = count
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
 
     def count_tokens(self, text: str) -> int:
-        tokens = self.encoder.encode(text)
-        return len(tokens)
+        key = self._text_key(text)
+        count = self._memo_get(key)
+        if count is None:
+            with TOKENIZER_SECONDS.time(operation="encode"):
+                count = len(self.encoder.encode(text))
+            self._memo_set(key, count)
+        return count
+
+    def count_tokens_batch(self, texts: Sequence[str]) -> List[int]:
+        """Count tokens for many texts, encoding only the ones not memoized"""
+        keys = [self._text_key(text) for text in texts]
+        counts = [self._memo_get(key) for key in keys]
+
+        missing = [i for i, count in enumerate(counts) if count is None]
+        if missing:
+            with TOKENIZER_SECONDS.time(operation="encode_batch"):
+                encoded = self.encoder.encode_batch([texts[i] for i in missing])
+            for i, tokens in zip(missing, encoded):
+                counts[i] = len(tokens)
+                self._memo_set(keys[i], counts[i])
+        return counts
+
+    def compare(self, original_text: str, optimized_text: str) -> TokenComparison:
+        original_tokens, optimized_tokens = self.count_tokens_batch(
+            [original_text, optimized_text]
+        )
+        return TokenComparison.from_counts(original_tokens, optimized_tokens)
 
     def optimized_tokens(self, original_text: str, optimized_text: str) -> int:
-        original_tokens = self.count_tokens(original_text)
-        optimized_tokens = self.count_tokens(optimized_text)
-        token_saving = original_tokens - optimized_tokens
-        return token_saving if token_saving > 0 else 0  # Ensures no negative values
+        return self.compare(original_text, optimized_text).token_savings
 
     def calculate_token_savings_percentage(
         self, original_text: str, optimized_text: str
     ) -> float:
-        original_tokens = self.count_tokens(original_text)
-        optimized_tokens = self.count_tokens(optimized_text)
-
-        if original_tokens == 0:  # Avoid division by zero
-            return 0.0
-
-        token_saving = original_tokens - optimized_tokens
-        return (token_saving / original_tokens) * 100
+        return self.compare(original_text, optimized_text).token_savings_percentage
@@ -0,0 +1,187 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, TypeVar
+
+from services.prompt_trimmer import (
+    TextProcessor,
+    TrimResult,
+    _trim_chunk_in_worker,
+    _trim_in_worker,
+    make_trim_pool,
+)
+
+
+T = TypeVar("T")
+
+
+class TrimExecutorBusy(Exception):
+    """Raised when the executor already has max_pending trims in flight"""
+
+
+class TrimLease:
+    """
+    Pending slots held across several calls, e.g. one streamed upload.
+
+    run() puts stateful work, which cannot move to another process, on the
+    executor's trim threads; release() is safe to call more than once.
+    """
+
+    def __init__(self, executor: "TrimExecutor", slots: int):
+        self.executor = executor
+        self.slots = slots
+        self.released = False
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor._thread_executor(), fn, *args
+        )
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.executor.pending -= self.slots
+            self.executor.completed += 1
+
+
+class TrimExecutor:
+    """
+    Runs TextProcessor.trim off the event loop.
+
+    At most max_workers trims run at once and at most max_pending are
+    accepted (running plus queued); beyond that trim() raises
+    TrimExecutorBusy instead of queueing without bound. Threads share the
+    given processor; processes sidestep the GIL but build their own.
+    trim_many batches share one process pool of batch_workers processes,
+    started on the first batch, and hold one pending slot per process they
+    may occupy. lease() holds a slot for work spread over many calls.
+    """
+
+    def __init__(
+        self,
+        processor: TextProcessor,
+        max_workers: int = 4,
+        max_pending: int = 32,
+        use_processes: bool = False,
+        batch_workers: Optional[int] = None,
+    ):
+        self.processor = processor
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.use_processes = use_processes
+        self._executor: Executor = (
+            make_trim_pool(processor.language, max_workers)
+            if use_processes
+            else ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="trim"
+            )
+        )
+        self.batch_workers = batch_workers or os.cpu_count() or 1
+        self._batch_executor: Optional[ProcessPoolExecutor] = None
+        self._stream_executor: Optional[ThreadPoolExecutor] = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def trim(self, text: str, **options) -> TrimResult:
+        self._reserve()
+        loop = asyncio.get_running_loop()
+        try:
+            if self.use_processes:
+                result = await loop.run_in_executor(
+                    self._executor, _trim_in_worker, text, options
+                )
+            else:
+                result = await loop.run_in_executor(
+                    self._executor,
+                    lambda: self.processor.trim_with_stats(text, **options),
+                )
+        finally:
+            self.pending -= 1
+
+        self.completed += 1
+        return result
+
+    async def trim_many(
+        self,
+        texts: Sequence[str],
+        workers: Optional[int] = None,
+        chunksize: Optional[int] = None,
+        **options,
+    ) -> List[str]:
+        """
+        Trim a batch on the shared pool, returning results in input order
+
+        The batch is split into chunks and at most workers of them run at
+        once, so workers bounds the processes one batch can hold.
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        workers = min(workers or self.batch_workers, self.batch_workers, len(texts))
+        slots = min(workers, self.max_pending)
+        self._reserve(slots)
+        try:
+            if self._batch_executor is None:
+                self._batch_executor = make_trim_pool(
+                    self.processor.language, self.batch_workers
+                )
+            if chunksize is None:
+                chunksize = max(1, len(texts) // (workers * 4))
+            chunks = [
+                texts[i : i + chunksize] for i in range(0, len(texts), chunksize)
+            ]
+            loop = asyncio.get_running_loop()
+            limit = asyncio.Semaphore(workers)
+
+            async def run(chunk: List[str]) -> List[str]:
+                async with limit:
+                    return await loop.run_in_executor(
+                        self._batch_executor, _trim_chunk_in_worker, chunk, options
+                    )
+
+            results = await asyncio.gather(*(run(chunk) for chunk in chunks))
+        finally:
+            self.pending -= slots
+
+        self.completed += 1
+        return [text for chunk in results for text in chunk]
+
+    def lease(self, slots: int = 1) -> TrimLease:
+        """Hold slots until the lease is released; raises TrimExecutorBusy"""
+        self._reserve(slots)
+        return TrimLease(self, slots)
+
+    def _thread_executor(self) -> Executor:
+        if not self.use_processes:
+            return self._executor
+        if self._stream_executor is None:
+            self._stream_executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="trim-stream"
+            )
+        return self._stream_executor
+
+    def _reserve(self, slots: int = 1):
+        if self.pending + slots > self.max_pending:
+            self.rejected += 1
+            raise TrimExecutorBusy(
+                f"{self.pending} trims pending, limit is {self.max_pending}"
+            )
+        self.pending += slots
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "maxWorkers": self.max_workers,
+            "maxPending": self.max_pending,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._batch_executor is not None:
+            self._batch_executor.shutdown(wait=False, cancel_futures=True)
+        if self._stream_executor is not None:
+            self._stream_executor.shutdown(wait=False, cancel_futures=True)
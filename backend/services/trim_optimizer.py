@@ -0,0 +1,129 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from services.model_output_comparison import ModelOutputComparison
+from services.token_tracker import TokenTracker
+from services.trim_executor import TrimExecutor
+
+# Roughly from most to least aggressive; {} is trim() with its defaults
+DEFAULT_CANDIDATES: List[Dict] = [
+    {"stemmer": "porter"},
+    {},
+    {"remove_spaces": False, "stemmer": "porter"},
+    {"remove_spaces": False},
+    {"remove_spaces": False, "min_chunk_length": 40},
+    {"remove_spaces": False, "remove_punctuation": False},
+    {"remove_spaces": False, "remove_stopwords": False},
+    {"remove_spaces": False, "remove_stopwords": False, "remove_chunks": False},
+]
+
+
+@dataclass
+class TrimCandidate:
+    options: Optional[Dict]  # None means the prompt was left untrimmed
+    text: str
+    tokens: int
+    token_savings: int
+    similarity: Optional[float] = None
+
+
+@dataclass
+class TrimSearchResult:
+    best: TrimCandidate
+    evaluated: List[TrimCandidate] = field(default_factory=list)
+    similarity_threshold: float = 0.0
+
+
+class TrimOptimizer:
+    """
+    Searches trim settings for the largest token savings whose prompt
+    embedding stays above a similarity threshold to the original prompt.
+
+    All candidates are trimmed concurrently on the TrimExecutor, each
+    taking one of its pending slots, and then token-counted. Embeddings
+    are scored in batches from most to least savings, and the search
+    stops at the first batch with a passing candidate: every candidate
+    after it saves fewer tokens, so it is dominated.
+    """
+
+    def __init__(
+        self,
+        trim_executor: TrimExecutor,
+        token_tracker: TokenTracker,
+        comparison_service: ModelOutputComparison,
+        candidates: Optional[List[Dict]] = None,
+        batch_size: int = 4,
+    ):
+        self.trim_executor = trim_executor
+        self.token_tracker = token_tracker
+        self.comparison_service = comparison_service
+        self.candidates = candidates or DEFAULT_CANDIDATES
+        self.batch_size = batch_size
+
+    async def search(
+        self, text: str, similarity_threshold: float = 0.9
+    ) -> TrimSearchResult:
+        """Raises TrimExecutorBusy when the executor has no room for a candidate"""
+        results = await asyncio.gather(
+            *(self.trim_executor.trim(text, **options) for options in self.candidates)
+        )
+        # tokenizing and embedding block, so they run in a thread
+        return await asyncio.to_thread(
+            self._rank, text, [result.text for result in results], similarity_threshold
+        )
+
+    def _rank(
+        self, text: str, trimmed: List[str], similarity_threshold: float
+    ) -> TrimSearchResult:
+        # identical outputs need scoring only once
+        unique: Dict[str, Dict] = {}
+        for options, candidate_text in zip(self.candidates, trimmed):
+            unique.setdefault(candidate_text, options)
+
+        original_tokens, *candidate_tokens = self.token_tracker.count_tokens_batch(
+            [text, *unique]
+        )
+        ranked = sorted(
+            (
+                TrimCandidate(
+                    options=options,
+                    text=candidate_text,
+                    tokens=tokens,
+                    token_savings=original_tokens - tokens,
+                )
+                for (candidate_text, options), tokens in zip(
+                    unique.items(), candidate_tokens
+                )
+            ),
+            key=lambda c: -c.token_savings,
+        )
+
+        evaluated: List[TrimCandidate] = []
+        for start in range(0, len(ranked), self.batch_size):
+            batch = ranked[start : start + self.batch_size]
+            scores = self.comparison_service.calculate_similarity_batch(
+                [text] * len(batch), [candidate.text for candidate in batch]
+            )
+            for candidate, score in zip(batch, np.asarray(scores, dtype=float)):
+                candidate.similarity = float(score)
+            evaluated.extend(batch)
+
+            passing = [c for c in batch if c.similarity >= similarity_threshold]
+            if passing:
+                return TrimSearchResult(
+                    best=passing[0],
+                    evaluated=evaluated,
+                    similarity_threshold=similarity_threshold,
+                )
+
+        # nothing is similar enough: leave the prompt untouched
+        return TrimSearchResult(
+            best=TrimCandidate(
+                options=None, text=text, tokens=original_tokens, token_savings=0
+            ),
+            evaluated=evaluated,
+            similarity_threshold=similarity_threshold,
+        )
@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+# tests import the services package the same way main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def processor():
+    """A TextProcessor; skips when the NLTK tokenizer and stopword data are absent"""
+    from services.nltk_resources import missing_resources
+    from services.prompt_trimmer import TextProcessor
+
+    missing = missing_resources()
+    if missing:
+        pytest.skip(
+            f"NLTK resources {missing} are not installed; run "
+            "`python -m services.nltk_resources` from backend/ to bundle them"
+        )
+    return TextProcessor()
+
+
+@pytest.fixture(scope="session")
+def token_tracker():
+    """A TokenTracker; skips when tiktoken cannot load its encoding"""
+    from services.token_tracker import TokenTracker
+
+    try:
+        return TokenTracker()
+    except Exception as e:  # tiktoken downloads the BPE file on first use
+        pytest.skip(f"tiktoken encoding unavailable: {e}")
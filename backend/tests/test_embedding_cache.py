@@ -0,0 +1,35 @@
+import numpy as np
+
+from services.embedding_cache import EmbeddingCache, MemmapEmbeddingStore, embedding_key
+
+
+def test_lone_surrogates_get_their_own_key():
+    cache = EmbeddingCache("model")
+    cache.put_many(["a\ud800b"], np.ones((1, 4), dtype=np.float32))
+
+    assert embedding_key("model", "a\ud800b") != embedding_key("model", "a\ud801b")
+    assert cache.get_many(["a\ud800b", "a\ud801b"])[1] is None
+    np.testing.assert_array_equal(cache.get_many(["a\ud800b"])[0], np.ones(4))
+
+
+def test_cached_rows_do_not_keep_the_batch_alive():
+    cache = EmbeddingCache("model")
+    batch = np.ones((100, 4), dtype=np.float32)
+    cache.put_many(["first"], batch[:1])
+
+    assert cache.get_many(["first"])[0].base is None
+
+
+def test_store_shared_by_two_writers_never_returns_another_texts_vector(tmp_path):
+    path = str(tmp_path / "embeddings")
+    first = MemmapEmbeddingStore(path, dim=4, capacity=2)
+    first.flush()
+    second = MemmapEmbeddingStore(path, dim=4, capacity=2)
+
+    first.put(b"a" * 16, np.full(4, 1, dtype=np.float32))
+    # second never saw row 0 being used, so it writes there too
+    second.put(b"b" * 16, np.full(4, 2, dtype=np.float32))
+
+    assert first.get(b"a" * 16) is None
+    np.testing.assert_array_equal(second.get(b"b" * 16), np.full(4, 2))
+    assert len(first) == 0
@@ -0,0 +1,127 @@
+import asyncio
+import random
+
+import pytest
+
+from services.llm_providers import EchoProvider
+from services.llm_service import LLMInteractionService
+from services.response_cache import MemoryCache
+
+LATENCY = 0.05
+
+
+class CountingProvider(EchoProvider):
+    def __init__(self, latency: float = LATENCY, fail: bool = False):
+        super().__init__(latency=latency)
+        self.calls = 0
+        self.fail = fail
+
+    async def complete(self, prompt, model, temperature, system=None):
+        self.calls += 1
+        if self.fail:
+            await asyncio.sleep(self.latency)
+            raise RuntimeError("provider down")
+        return await super().complete(prompt, model, temperature)
+
+
+def test_concurrent_identical_requests_share_one_completion():
+    async def burst():
+        provider = CountingProvider()
+        service = LLMInteractionService(provider=provider)
+        rng = random.Random(0)
+        requests = [
+            (
+                f"popular prompt {rng.randrange(20)}",
+                rng.choice(["original", "trimmed"]),
+                rng.choice([None, "small-model"]),
+            )
+            for _ in range(500)
+        ]
+        answers = await asyncio.gather(
+            *(
+                service.get_answer(prompt, namespace=namespace, model=model)
+                for prompt, namespace, model in requests
+            )
+        )
+        return provider, service, requests, answers
+
+    provider, service, requests, answers = asyncio.run(burst())
+
+    unique = {(prompt, model) for prompt, _, model in requests}
+    by_key = {}
+    for (prompt, _, model), answer in zip(requests, answers):
+        assert by_key.setdefault((prompt, model), answer) == answer
+    assert provider.calls == len(unique)
+    assert service.coalesced == len(requests) - len(unique)
+    assert service.stats()["inFlight"] == 0
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    async def run():
+        provider = CountingProvider()
+        service = LLMInteractionService(provider=provider)
+        leader = asyncio.ensure_future(service.get_answer("shared prompt"))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(service.get_answer("shared prompt"))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return provider, service, await follower
+
+    provider, service, answer = asyncio.run(run())
+
+    assert answer
+    assert provider.calls == 1
+    assert service.coalesced == 1
+
+
+def test_failure_reaches_every_caller_and_is_not_kept():
+    async def run():
+        provider = CountingProvider(fail=True)
+        service = LLMInteractionService(provider=provider)
+        results = await asyncio.gather(
+            *(service.get_answer("shared prompt") for _ in range(5)),
+            return_exceptions=True,
+        )
+        return provider, service, results
+
+    provider, service, results = asyncio.run(run())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert provider.calls == 1
+    assert service.stats()["inFlight"] == 0
+
+    # the next call starts a fresh completion instead of reusing the failure
+    provider.fail = False
+    assert asyncio.run(service.get_answer("shared prompt"))
+    assert provider.calls == 2
+
+
+def test_sequential_calls_are_not_coalesced():
+    provider = CountingProvider(latency=0)
+    service = LLMInteractionService(provider=provider)
+
+    async def run():
+        await service.get_answer("prompt")
+        await service.get_answer("prompt")
+
+    asyncio.run(run())
+
+    assert provider.calls == 2
+    assert service.coalesced == 0
+
+
+@pytest.mark.parametrize("namespace", ["original", "trimmed"])
+def test_response_cache_is_checked_before_coalescing(namespace):
+    provider = CountingProvider(latency=0)
+    service = LLMInteractionService(provider=provider, cache=MemoryCache())
+
+    async def run():
+        first = await service.get_answer_cached("prompt", namespace=namespace)
+        second = await service.get_answer_cached("prompt", namespace=namespace)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == (second[0], False)
+    assert second[1] is True
+    assert provider.calls == 1
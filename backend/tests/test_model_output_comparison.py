@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from services.model_output_comparison import ModelOutputComparison
+
+PAIRS = [
+    (
+        "Can you please explain to me how the water cycle works?",
+        "explain water cycle works",
+    ),
+    (
+        "Write a short poem about the ocean at night, with the moon on the "
+        "water and a lighthouse in the distance.",
+        "Write short poem ocean night moon water lighthouse distance",
+    ),
+    (
+        "def add(a, b):\n    return a + b\n\nWhat does this function do?",
+        "def add(a, b): return a + b What does function do?",
+    ),
+    ("The capital of France is Paris.", "Berlin is in Germany."),
+    ("I really love this product!", "I do not love this product at all."),
+]
+
+# largest allowed |cosine - torch cosine| per backend
+TOLERANCE = {"onnx": 1e-3, "onnx-int8": 0.03}
+
+
+def similarities(comparison):
+    return comparison.calculate_similarity_batch(
+        [a for a, _ in PAIRS], [b for _, b in PAIRS]
+    )
+
+
+@pytest.fixture(scope="module")
+def torch_scores():
+    pytest.importorskip("sentence_transformers")
+    return similarities(ModelOutputComparison())
+
+
+@pytest.mark.parametrize("backend", sorted(TOLERANCE))
+def test_backend_cosine_scores_match_torch(backend, torch_scores):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("optimum")
+
+    scores = similarities(ModelOutputComparison(backend=backend))
+
+    np.testing.assert_allclose(scores, torch_scores, atol=TOLERANCE[backend])
+
+
+def test_max_seq_length_truncates_inputs():
+    pytest.importorskip("sentence_transformers")
+    comparison = ModelOutputComparison(max_seq_length=6)
+
+    assert comparison.model.max_seq_length == 6
+    # [CLS], four word tokens and [SEP]: only the shared prefix is embedded
+    prefix = "The quick brown fox"
+    score = comparison.calculate_similarity(
+        f"{prefix} jumps over the lazy dog near the river bank at dawn",
+        f"{prefix} reads a spreadsheet of quarterly revenue figures",
+    )
+    assert score > 0.999
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="unknown embedding backend"):
+        ModelOutputComparison(backend="tensorflow")
+
+
+def test_embedding_name_separates_cache_namespaces():
+    assert ModelOutputComparison.embedding_name() == ModelOutputComparison.model_name
+    names = {
+        ModelOutputComparison.embedding_name(backend, max_seq_length)
+        for backend in ("torch", "onnx", "onnx-int8")
+        for max_seq_length in (None, 128)
+    }
+    assert len(names) == 6
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from services.prompt_trimmer import TextProcessor
+
+SAMPLE_PROMPTS = [
+    "What is the capital of France?",
+    "Summarize the following article in three bullet points, focusing on the "
+    "main arguments and leaving out any examples.",
+    'Translate "Good morning, how are you?" into German and Spanish.',
+    "You are a helpful assistant. Answer the question based only on the "
+    "context below. If the answer is not in the context, say you do not know.",
+    "Write a Python function that returns the n-th Fibonacci number; it "
+    "should run in O(n) time and use O(1) memory.",
+    "Compare the state-of-the-art approaches for retrieval-augmented "
+    "generation (RAG) published between 2020 and 2024.",
+    "The invoice total was $1,250.75 and it is due on 12:30 Monday -- please "
+    "remind me!",
+    "List 5 reasons why unit tests matter... then explain each one briefly.",
+    "Do NOT include any personal opinions. Keep the tone neutral and formal.",
+    "Explain the difference between TCP and UDP to a ten-year-old.",
+]
+
+BOILERPLATE = (
+    "This message and any attachments are confidential and intended solely "
+    "for the addressee. If you received it in error, please delete it. "
+)
+
+
+def ordered_chunk_spans(processor, text, min_length=15):
+    """Spans in the order the old loop removed them"""
+    chunks = processor.find_repeated_chunks(text, min_length=min_length)
+    order = []
+    for chunk, positions, _ in sorted(
+        processor.find_non_overlapping_chunks(chunks),
+        key=lambda x: (-x[1][0], -len(x[0])),
+    ):
+        for pos in sorted(positions[1:], reverse=True):
+            order.append((pos, pos + len(chunk)))
+    return order
+
+
+def legacy_remove(text, ordered_spans):
+    """The string rebuilding _remove_spans replaced"""
+    for start, end in ordered_spans:
+        text = text[:start] + " " + text[end:]
+    return text
+
+
+def test_remove_spans_matches_legacy_rebuilding(processor):
+    # the old loop read later positions against the already shortened text,
+    # so it is only a valid oracle when each span lies before all earlier ones
+    rng = random.Random(42)
+    compared = 0
+    for _ in range(300):
+        text = "".join(
+            rng.choice(["abc ", "hello world ", BOILERPLATE, "xyz. "])
+            for _ in range(rng.randint(1, 12))
+        )
+        spans = ordered_chunk_spans(processor, text)
+        if any(later[1] > earlier[0] for earlier, later in zip(spans, spans[1:])):
+            continue
+        assert processor._remove_spans(text, spans) == legacy_remove(text, spans)
+        compared += 1
+    assert compared > 100
+
+
+def test_remove_spans_merges_overlaps():
+    text = "0123456789"
+    assert TextProcessor._remove_spans(text, [(2, 5), (4, 7), (8, 9)]) == "01 7 9"
+    assert TextProcessor._remove_spans(text, []) == text
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"remove_spaces": False},
+        {"remove_punctuation": False, "remove_spaces": False},
+        {"remove_stopwords": False},
+        {"stemmer": "porter", "remove_spaces": False},
+        {"stemmer": "snowball", "remove_chunks": False},
+    ],
+)
+def test_fast_engine_matches_nltk(processor, options):
+    for prompt in SAMPLE_PROMPTS + [BOILERPLATE * 3]:
+        expected = processor.trim(prompt, engine="nltk", **options)
+        assert processor.trim(prompt, engine="fast", **options) == expected, prompt
@@ -0,0 +1,54 @@
+import asyncio
+
+from services.response_cache import (
+    MemoryCache,
+    SQLiteCache,
+    TieredCache,
+    make_cache_key,
+)
+
+
+def test_sqlite_cache_stays_bounded_without_counting_every_write(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "responses.db"), max_entries=200)
+
+    for i in range(1_000):
+        cache.set(f"key {i}", f"value {i}")
+
+    rows = cache._count_rows()
+    assert 200 - 200 // 100 <= rows <= 200
+    assert cache.stats()["entries"] == rows
+    # the newest entries survive eviction
+    assert cache.get("key 999") == "value 999"
+    assert cache.get("key 0") is None
+
+
+def test_sqlite_cache_reopens_with_its_row_count(tmp_path):
+    path = str(tmp_path / "responses.db")
+    cache = SQLiteCache(path)
+    cache.set("a", "1")
+    cache.set("b", "2")
+
+    assert SQLiteCache(path).stats()["entries"] == 2
+
+
+def test_tiered_cache_async_reads_promote_disk_hits(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "responses.db"))
+    cache = TieredCache(memory=MemoryCache(), disk=disk)
+
+    async def run():
+        await cache.aset("key", "value")
+        cache.memory = MemoryCache()
+        first = await cache.aget("key")
+        second = await cache.aget("key")
+        return first, second
+
+    assert asyncio.run(run()) == ("value", "value")
+    assert disk.stats()["hits"] == 1
+    assert cache.memory.stats()["hits"] == 1
+
+
+def test_cache_key_accepts_lone_surrogates():
+    key = make_cache_key("gpt-4o-mini", 0.3, "a\ud800b")
+
+    assert key != make_cache_key("gpt-4o-mini", 0.3, "a\ud801b")
+    assert make_cache_key("m", 0.3, "café") == make_cache_key("m", 0.3, "café")
@@ -0,0 +1,61 @@
+import json
+
+import numpy as np
+
+from services.semantic_cache import SemanticCache
+
+SCOPE = SemanticCache.scope("original", "gpt-4o-mini", 0.3)
+
+
+def unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_answers_round_trip_through_the_json_sidecar(tmp_path):
+    path = str(tmp_path / "semantic")
+    cache = SemanticCache(encode=None, path=path, save_every=2)
+    long_answer = "x" * 10_000
+
+    assert cache.add(unit(1, 0), "short", SCOPE) is False
+    assert cache.add(unit(0, 1), long_answer, SCOPE) is True
+    cache.save()
+
+    with open(f"{path}.json") as f:
+        assert json.load(f)["answers"] == ["short", long_answer]
+    with np.load(f"{path}.npz") as data:
+        assert "answers" not in data.files
+
+    reloaded = SemanticCache(encode=None, path=path)
+    assert reloaded.lookup(unit(1, 0), SCOPE)[0] == "short"
+    assert reloaded.lookup(unit(0, 1), SCOPE)[0] == long_answer
+
+
+def test_mismatched_sidecar_starts_empty(tmp_path):
+    path = str(tmp_path / "semantic")
+    cache = SemanticCache(encode=None, path=path)
+    cache.add(unit(1, 0), "first", SCOPE)
+    cache.save()
+    with open(f"{path}.json") as f:
+        sidecar = json.load(f)
+    cache.add(unit(0, 1), "second", SCOPE)
+    cache.save()
+    # as if the process died between replacing the sidecar and the vectors
+    with open(f"{path}.json", "w") as f:
+        json.dump(sidecar, f)
+
+    assert SemanticCache(encode=None, path=path).stats()["entries"] == 0
+
+
+def test_loads_files_written_before_the_sidecar(tmp_path):
+    path = str(tmp_path / "semantic")
+    np.savez(
+        f"{path}.npz",
+        vectors=np.stack([unit(1, 0), unit(0, 1)]),
+        last_used=np.array([1, 2]),
+        answers=np.array(["a", "b"], dtype=str),
+        scopes=np.array([SCOPE, SCOPE], dtype=str),
+    )
+
+    cache = SemanticCache(encode=None, path=path)
+    assert cache.lookup(unit(0, 1), SCOPE)[0] == "b"
@@ -0,0 +1,12 @@
+from services.token_tracker import TokenTracker
+
+
+def test_lone_surrogates_are_counted(token_tracker):
+    tracker = token_tracker
+
+    comparison = tracker.compare("a\ud800b", "b")
+
+    assert comparison.original_tokens == len(tracker.encoder.encode("a\ud800b"))
+    assert comparison.optimized_tokens == tracker.count_tokens("b")
+    # the memo key must still tell the surrogate apart from similar text
+    assert TokenTracker._text_key("a\ud800b") != TokenTracker._text_key("a\ud801b")
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from services.trim_executor import TrimExecutor, TrimExecutorBusy
+
+PROMPTS = [
+    "Please summarize the following article in three short bullet points.",
+    "What is the capital of France, and what is it famous for?",
+    "Explain the difference between TCP and UDP to a ten-year-old.",
+] * 4
+
+
+def test_trim_many_matches_trim_and_holds_one_slot_per_worker(processor):
+    executor = TrimExecutor(processor, max_pending=3, batch_workers=2)
+
+    async def run():
+        batch = asyncio.ensure_future(executor.trim_many(PROMPTS, workers=2))
+        await asyncio.sleep(0)
+        held = executor.pending
+        # a second two-worker batch does not fit in the remaining slot
+        with pytest.raises(TrimExecutorBusy):
+            await executor.trim_many(PROMPTS, workers=2)
+        single = await executor.trim(PROMPTS[0])
+        return held, single, await batch
+
+    try:
+        held, single, trimmed = asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    assert held == 2
+    assert single.text == trimmed[0]
+    assert trimmed == [processor.trim(prompt) for prompt in PROMPTS]
+    assert executor.pending == 0
+
+
+def test_trim_many_accepts_more_workers_than_the_pool_has(processor):
+    executor = TrimExecutor(processor, max_pending=2, batch_workers=1)
+
+    async def run():
+        return await executor.trim_many(PROMPTS[:3], workers=64, chunksize=1)
+
+    try:
+        trimmed = asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    assert trimmed == [processor.trim(prompt) for prompt in PROMPTS[:3]]
+
+
+def test_lease_holds_a_slot_until_released(processor):
+    executor = TrimExecutor(processor, max_pending=1)
+
+    async def run():
+        lease = executor.lease()
+        with pytest.raises(TrimExecutorBusy):
+            await executor.trim(PROMPTS[0])
+        trimmed = await lease.run(processor.trim, PROMPTS[0])
+        lease.release()
+        lease.release()
+        return trimmed
+
+    try:
+        trimmed = asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    assert trimmed == processor.trim(PROMPTS[0])
+    assert executor.pending == 0